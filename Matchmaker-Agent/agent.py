@@ -1,24 +1,227 @@
-from openai import OpenAI
+import hashlib
+import json
 import os
+import sys
+import threading
+import time
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+from tools import find_matches, load_index, load_profiles
+
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+APP_DIR = Path(__file__).resolve().parent
+PROFILES_PATH = APP_DIR / "data" / "profiles.json"
+INDEX_PATH = APP_DIR / "data" / "profile_index"
+
+MODEL = "gpt-4o"
+TEMPERATURE = 0.8
+TOP_K = 5
+CACHE_TTL_SECONDS = 3600
+CACHE_ENTRIES = 1024
+
+# Profile fields sent to the model, each cut to SUMMARY_CHARS
+SUMMARY_FIELDS = ("name", "age", "gender", "location", "interests", "bio")
+SUMMARY_CHARS = 200
+
+SYSTEM_PROMPT = (
+    "You are a thoughtful and respectful AI matchmaker. "
+    "Your job is to find a compatible partner based on the user's personality, interests, and preferences. "
+    "Make it warm, empathetic, and romantic."
+)
+GROUNDING_PROMPT = (
+    " Recommend the best match from the candidate profiles below, refer to them by name "
+    "and explain why they suit the user. Do not invent people who are not listed."
+)
+
+
+def normalise_form(form: dict) -> dict:
+    """Form fields with case and spacing ignored, so equivalent submissions share a cache entry."""
+    return {
+        key: " ".join(str(value).casefold().split()) if isinstance(value, str) else value
+        for key, value in sorted(form.items())
+    }
+
+
+def form_prompt(form: dict) -> str:
+    return (
+        f"My name is {form['name']}, I'm a {form['age']}-year-old {form['gender']}. "
+        f"My interests include {form['interests']}. "
+        f"I'm looking for a partner who is {form['looking_for']}."
+    )
+
+
+def summarise_profile(profile: dict) -> str:
+    """One compact line per candidate instead of the whole profile."""
+    parts = []
+    for field in SUMMARY_FIELDS:
+        value = profile.get(field)
+        if value in (None, ""):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(map(str, value))
+        value = str(value)
+        if len(value) > SUMMARY_CHARS:
+            value = value[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+        parts.append(f"{field}: {value}")
+    return "; ".join(parts)
+
+
+class MatchmakerAgent:
+    """
+    Retrieval-grounded matchmaker.
+
+    The top-k candidate profiles are found locally with the TF-IDF index
+    from tools.py, and only their compact summaries go to the model.
+    Replies stream token by token and are cached, with a TTL, by a hash of
+    the normalised form fields and the candidate ids, so a repeated
+    submission costs no generation. `client` is anything shaped like
+    `openai.OpenAI` (`chat.completions.create(..., stream=True)`), so a
+    fake can stand in for benchmarks.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model=MODEL,
+        profiles_path=PROFILES_PATH,
+        index_path=INDEX_PATH,
+        top_k=TOP_K,
+        cache_ttl=CACHE_TTL_SECONDS,
+    ):
+        self._client = client
+        self.model = model
+        self.profiles_path = profiles_path
+        self.index_path = index_path
+        self.top_k = top_k
+        self.cache = LRUCache(max_entries=CACHE_ENTRIES, ttl=cache_ttl)
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._profiles = None
+        self._index = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI  # Imported with the first request, not at page load
+
+            self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    def _load(self):
+        with self._lock:
+            if not self._loaded:
+                try:
+                    self._profiles = load_profiles(str(self.profiles_path))
+                    self._index = load_index(self._profiles, str(self.index_path))
+                except FileNotFoundError:
+                    self._profiles = None  # No profile data; recommend without candidates
+                self._loaded = True
+        return self._profiles, self._index
+
+    def candidates(self, form: dict) -> list:
+        """Top-k (profile, Match) pairs for the form's interests and wishes."""
+        profiles, index = self._load()
+        if profiles is None or not len(profiles):
+            return []
+        bio = f"{form['interests']} {form['looking_for']}"
+        matches = find_matches({"bio": bio}, profiles, top_n=self.top_k, index=index)
+        found = ((profiles.get(match.profile_id), match) for match in matches)
+        return [(profile, match) for profile, match in found if profile is not None]
+
+    def build_messages(self, form: dict, candidates: list) -> list:
+        system = SYSTEM_PROMPT
+        user = form_prompt(form)
+        if candidates:
+            system += GROUNDING_PROMPT
+            listing = "\n".join(
+                f"{n}. {summarise_profile(profile)} (similarity {match.score}%)"
+                for n, (profile, match) in enumerate(candidates, start=1)
+            )
+            user += f"\n\nCandidate profiles:\n{listing}"
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def cache_key(self, form: dict, candidates: list) -> str:
+        payload = {
+            "model": self.model,
+            "form": normalise_form(form),
+            "candidates": [str(match.profile_id) for _, match in candidates],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def stream(self, form: dict, candidates=None):
+        """
+        Yield the recommendation as it is generated.
+
+        Args:
+            form (dict): name, age, gender, interests and looking_for.
+            candidates (list, optional): Result of `candidates(form)`, if
+                already retrieved.
+        """
+        if candidates is None:
+            candidates = self.candidates(form)
+        key = self.cache_key(form, candidates)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self.build_messages(form, candidates),
+            temperature=TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts = []
+        for chunk in response:
+            if getattr(chunk, "usage", None):
+                self.usage["prompt_tokens"] += chunk.usage.prompt_tokens
+                self.usage["completion_tokens"] += chunk.usage.completion_tokens
+                metrics.count("matchmaker_llm_tokens_total", chunk.usage.prompt_tokens, kind="prompt")
+                metrics.count("matchmaker_llm_tokens_total", chunk.usage.completion_tokens, kind="completion")
+            if not chunk.choices:
+                continue  # The final usage-only chunk
+            text = chunk.choices[0].delta.content
+            if text:
+                if not parts:
+                    metrics.observe("matchmaker_llm_first_token_seconds", time.perf_counter() - started)
+                parts.append(text)
+                yield text
+        # Spans cannot wrap a generator the caller may abandon, so time it by hand
+        metrics.observe("matchmaker_llm_seconds", time.perf_counter() - started)
+        # Only complete replies are cached; an interrupted stream is retried next time
+        if parts:
+            self.cache.put(key, "".join(parts))
+
+    def recommend(self, form: dict) -> str:
+        return "".join(self.stream(form))
+
+
+@shared
+def get_agent():
+    agent = MatchmakerAgent()
+    metrics.watch_cache("matchmaker_replies", agent.cache.stats)
+    return agent
+
 
 def get_match_recommendation(user_input: str) -> str:
-    response = client.chat.completions.create(
-        model="gpt-4o",
+    """Ungrounded, non-streaming reply to a free-form prompt."""
+    response = get_agent().client.chat.completions.create(
+        model=MODEL,
         messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a thoughtful and respectful AI matchmaker. "
-                    "Your job is to find a compatible partner based on the user's personality, interests, and preferences. "
-                    "Make it warm, empathetic, and romantic."
-                ),
-            },
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_input},
         ],
-        temperature=0.8,
+        temperature=TEMPERATURE,
     )
     return response.choices[0].message.content
@@ -0,0 +1,204 @@
+import json
+import os
+
+import numpy as np
+
+from index import top_k
+from store import save_array
+
+
+META_FILE = "lsh.json"
+ARRAY_FILES = ("planes", "codes", "order")
+
+# Rows hashed per block while building, to bound the dense projection size
+BUILD_BLOCK = 65536
+
+
+class LSHIndex:
+    """
+    Random-projection LSH over the TF-IDF rows of a ProfileIndex.
+
+    Each of `n_tables` tables hashes a row to an `n_bits` signature from the
+    signs of its projections onto random hyperplanes. A query only rescores
+    the rows that share a bucket with it, so cost grows with bucket size
+    instead of corpus size. `n_probes` trades speed for recall at query time
+    by also visiting buckets one bit-flip away, least confident bits first.
+
+    Build offline with `build()` and `save()`; serving processes `load()`
+    the arrays memory-mapped and read-only. Buckets hold row numbers, so
+    the LSH index only fits the `generation` of the ProfileIndex it was
+    built from; rebuild it after a refit or `compact()`.
+    """
+
+    def __init__(self, planes, codes, order, path=None, generation=None):
+        self.planes = planes
+        self.codes = codes
+        self.order = order
+        self.path = path
+        self.generation = generation  # ProfileIndex.generation at build time
+
+    @property
+    def n_tables(self):
+        return self.codes.shape[0]
+
+    @property
+    def n_bits(self):
+        return self.planes.shape[1] // self.n_tables
+
+    @property
+    def n_built(self):
+        """Rows hashed at build time. Later rows are always rescored exactly."""
+        return self.codes.shape[1]
+
+    # ---------- Building ----------
+    @classmethod
+    def build(cls, index, n_tables=16, n_bits=12, seed=0):
+        """
+        Hash every row of a profile index.
+
+        Args:
+            index (ProfileIndex): Fitted profile index.
+            n_tables (int): Independent hash tables. More tables raise recall
+                and memory.
+            n_bits (int): Signature bits per table. More bits mean smaller
+                buckets, so faster queries with lower recall.
+            seed (int): Seed for the random hyperplanes.
+
+        Returns:
+            LSHIndex: The built index.
+        """
+        if not 1 <= n_bits <= 62:
+            raise ValueError("❌ n_bits must be between 1 and 62.")
+
+        rng = np.random.default_rng(seed)
+        n_features = len(index.vectorizer.vocabulary_)
+        planes = rng.standard_normal((n_features, n_tables * n_bits), dtype=np.float32)
+
+        matrix = index.matrix
+        codes = np.empty((n_tables, matrix.shape[0]), dtype=np.int64)
+        for start in range(0, matrix.shape[0], BUILD_BLOCK):
+            block = matrix[start:start + BUILD_BLOCK]
+            codes[:, start:start + block.shape[0]] = _signatures(block @ planes, n_tables, n_bits).T
+
+        order = np.argsort(codes, axis=1, kind="stable").astype(np.int64)
+        return cls(planes, np.take_along_axis(codes, order, axis=1), order, generation=index.generation)
+
+    # ---------- Querying ----------
+    def candidates(self, query, n_probes=1):
+        """
+        Rows that share a probed bucket with a vectorized query.
+
+        Args:
+            query (scipy.sparse matrix): Single TF-IDF row.
+            n_probes (int): Buckets visited per table, starting with the
+                query's own bucket.
+
+        Returns:
+            np.ndarray: Sorted, unique candidate rows.
+        """
+        projection = np.asarray(query @ self.planes).reshape(self.n_tables, self.n_bits)
+        base = _signatures(projection.reshape(1, -1), self.n_tables, self.n_bits)[0]
+
+        # Flip the bits whose projection is closest to the hyperplane first
+        weakest = np.argsort(np.abs(projection), axis=1)[:, :max(n_probes - 1, 0)]
+        found = []
+        for table in range(self.n_tables):
+            probes = [base[table]] + [base[table] ^ (1 << int(bit)) for bit in weakest[table]]
+            table_codes = self.codes[table]
+            for code in probes:
+                lo = np.searchsorted(table_codes, code, side="left")
+                hi = np.searchsorted(table_codes, code, side="right")
+                found.append(self.order[table, lo:hi])
+
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def search(self, index, user_bio, k=3, n_probes=1):
+        """
+        Approximate top-k rows for a bio, rescored with exact cosine.
+
+        Args:
+            index (ProfileIndex): The profile index this LSH was built from.
+            user_bio (str): The user's bio text.
+            k (int): Number of results.
+            n_probes (int): Recall/speed knob, see `candidates()`.
+
+        Returns:
+            tuple: (rows, scores) arrays, best first.
+
+        Raises:
+            ValueError: If `index` has renumbered its rows since this LSH
+                index was built.
+        """
+        if index.generation != self.generation or len(index.ids) < self.n_built:
+            raise ValueError("❌ The profile index changed its rows since this LSH index was built; rebuild it.")
+        query = index.transform([user_bio])
+        rows = self.candidates(query, n_probes)
+        rows = np.concatenate([rows, np.arange(self.n_built, len(index.ids))])
+        rows = rows[index.alive[rows]]
+
+        scores = (index.matrix[rows] @ query.T).toarray().ravel()
+        best, best_scores = top_k(scores, k)
+        return rows[best], best_scores
+
+    # ---------- Persistence ----------
+    def save(self, path):
+        """Write the hyperplanes and sorted bucket tables as .npy files."""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_FILES:
+            save_array(path, f"{name}.npy", getattr(self, name))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as file:
+            json.dump({"n_tables": self.n_tables, "n_bits": self.n_bits, "generation": self.generation}, file)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load an LSH index written by `save()`.
+
+        Args:
+            path (str): Directory the index was saved to.
+            mmap (bool): Memory-map the arrays read-only so many worker
+                processes share one copy.
+
+        Returns:
+            LSHIndex: The loaded index.
+        """
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            raise FileNotFoundError(f"⚠️ Could not find an LSH index at: {path}")
+
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        mmap_mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_FILES]
+        return cls(*arrays, path=path, generation=meta.get("generation"))
+
+
+def _signatures(projections, n_tables, n_bits):
+    """Pack projection signs into one integer code per table."""
+    bits = (np.asarray(projections) > 0).reshape(-1, n_tables, n_bits)
+    return bits @ (np.int64(1) << np.arange(n_bits, dtype=np.int64))
+
+
+def recall_at_k(lsh, index, user_bios, k=10, n_probes=1):
+    """
+    Share of the exact top-k that the LSH search also returns.
+
+    Args:
+        lsh (LSHIndex): Index under test.
+        index (ProfileIndex): Exact index it was built from.
+        user_bios (list): Sample query bios.
+        k (int): Result depth to compare.
+        n_probes (int): Probes per table for the LSH search.
+
+    Returns:
+        float: Mean recall@k over the queries, between 0 and 1.
+    """
+    recalls = []
+    for bio in user_bios:
+        exact_rows, exact_scores = top_k(index.similarities(bio), k)
+        expected = set(exact_rows[np.isfinite(exact_scores)].tolist())
+        if not expected:
+            continue
+        found, _ = lsh.search(index, bio, k=k, n_probes=n_probes)
+        recalls.append(len(expected & set(found.tolist())) / len(expected))
+    return float(np.mean(recalls)) if recalls else 1.0
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from index import ProfileIndex, top_k
+from tools import Match
+
+
+DEFAULT_CHUNK_SIZE = 1024
+
+# Index used by pool workers, set once per process by _init_worker
+_worker_index = None
+
+
+def _init_worker(source):
+    """Give each pool worker its own handle on the index (memory-mapped when saved)."""
+    global _worker_index
+    _worker_index = ProfileIndex.load(source) if isinstance(source, str) else source
+
+
+def _score_chunk(index, bios, k):
+    """Vectorize one chunk of bios and keep the top k rows per user."""
+    scores = index.similarity_block(index.transform(bios))
+    return top_k(scores, k)
+
+
+def _score_chunk_in_worker(bios, k):
+    return _score_chunk(_worker_index, bios, k)
+
+
+def batch_top_k(index, user_bios, k=3, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Top-k profiles for many users at once.
+
+    Users are scored in chunks with one sparse matrix-matrix product each,
+    so peak memory is about `chunk_size * len(index.ids)` floats per worker
+    no matter how many users are passed in.
+
+    Args:
+        index (ProfileIndex): Fitted profile index.
+        user_bios (list): Bio text of every user to match.
+        k (int): Number of matches per user.
+        chunk_size (int): Users scored per matrix product.
+        workers (int): Processes to spread chunks across. A saved, unmodified
+            index is memory-mapped by each worker instead of being copied.
+
+    Returns:
+        tuple: (rows, scores) arrays of shape (len(user_bios), k). Rows index
+            into `index.ids`; slots without a live profile hold -1 / -inf.
+    """
+    if chunk_size < 1:
+        raise ValueError("❌ chunk_size must be at least 1.")
+
+    k = min(k, len(index.ids))
+    rows = np.full((len(user_bios), k), -1, dtype=np.intp)
+    scores = np.full((len(user_bios), k), -np.inf)
+    chunks = [user_bios[start:start + chunk_size] for start in range(0, len(user_bios), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        source = index.path or index
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+            results = pool.map(_score_chunk_in_worker, chunks, [k] * len(chunks))
+            _fill(rows, scores, results, chunk_size)
+    else:
+        _fill(rows, scores, (_score_chunk(index, chunk, k) for chunk in chunks), chunk_size)
+
+    rows[~np.isfinite(scores)] = -1
+    return rows, scores
+
+
+def _fill(rows, scores, results, chunk_size):
+    for i, (chunk_rows, chunk_scores) in enumerate(results):
+        start = i * chunk_size
+        rows[start:start + len(chunk_rows)] = chunk_rows
+        scores[start:start + len(chunk_scores)] = chunk_scores
+
+
+def matches_for_everyone(users, index, top_n=3, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Nightly batch: top N matches for every user.
+
+    Args:
+        users (list): User dictionaries with a 'bio' key.
+        index (ProfileIndex): Fitted profile index.
+        top_n (int): Number of matches per user.
+        chunk_size (int): Users scored per matrix product.
+        workers (int): Number of worker processes.
+
+    Returns:
+        list: One list of Match records per user, best first, like
+            `find_matches`.
+    """
+    rows, scores = batch_top_k(
+        index, [user['bio'] for user in users], k=top_n, chunk_size=chunk_size, workers=workers
+    )
+    return [
+        [Match(index.ids[row], round(float(score) * 100, 2)) for row, score in zip(user_rows, user_scores) if row >= 0]
+        for user_rows, user_scores in zip(rows, scores)
+    ]
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+from scipy import sparse
+
+from store import ProfileStore, save_array
+
+
+META_FILE = "meta.json"
+ARRAY_FILES = ("data", "indices", "indptr", "alive", "idf")
+
+
+def top_k(scores, k):
+    """
+    Indices and values of the k highest scores, best first.
+
+    Uses `argpartition` so only the k winners get sorted. Works on a single
+    score vector or row-wise on a 2-D block of scores.
+
+    Args:
+        scores (np.ndarray): 1-D scores or a 2-D (queries x profiles) block.
+        k (int): Number of results per row.
+
+    Returns:
+        tuple: (indices, scores) arrays with k columns per row.
+    """
+    scores = np.asarray(scores)
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        empty = np.empty(scores.shape[:-1] + (0,))
+        return empty.astype(np.intp), empty.astype(scores.dtype)
+
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    part_scores = np.take_along_axis(scores, part, axis=-1)
+    order = np.argsort(-part_scores, axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1), np.take_along_axis(part_scores, order, axis=-1)
+
+
+class ProfileIndex:
+    """
+    TF-IDF index over profile bios that is fitted once and reused per query.
+
+    The vocabulary and IDF weights are frozen at fit time, so single profiles
+    can be added, updated or deleted by transforming just their own bio.
+    Deleted rows are tombstoned and dropped on the next `compact()`.
+    Call `fit()` again when the corpus has drifted enough to need a new
+    vocabulary.
+
+    `generation` changes whenever existing rows are renumbered (a new fit
+    or `compact()`), so structures keyed by row number, like an LSHIndex,
+    can tell that they are stale.
+    """
+
+    def __init__(self, vectorizer, matrix, ids, alive=None, path=None, fingerprint=None, generation=None):
+        self.vectorizer = vectorizer
+        self.path = path
+        self.fingerprint = fingerprint  # Of the profiles it was fitted on; None once edited
+        self.generation = generation or uuid.uuid4().hex
+        self._matrix = matrix
+        self._pending = []
+        self.ids = list(ids)
+        self.alive = np.ones(len(self.ids), dtype=bool) if alive is None else np.array(alive, dtype=bool)
+        self._rows = {profile_id: row for row, profile_id in enumerate(self.ids) if self.alive[row]}
+
+    # ---------- Building ----------
+    @classmethod
+    def fit(cls, profiles, id_key="id"):
+        """
+        Fit the vocabulary and TF-IDF matrix over the profiles.
+
+        Args:
+            profiles (ProfileStore | list): Profiles with a 'bio' field.
+            id_key (str): Field used as the profile id for a list of dicts.
+                Profiles without it are identified by their position.
+
+        Returns:
+            ProfileIndex: The fitted index.
+        """
+        ids, bios = _ids_and_bios(profiles, id_key)
+
+        # Imported on first use, so loading the app does not pay for scikit-learn
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(bios).tocsr()
+        return cls(vectorizer, matrix, ids, fingerprint=_fingerprint(ids, bios))
+
+    @staticmethod
+    def fingerprint_of(profiles, id_key="id"):
+        """
+        Hash of the profile ids and bios an index fitted on `profiles` has.
+
+        Compare it with `fingerprint` to tell whether a saved index is
+        stale after profiles.json changed.
+        """
+        return _fingerprint(*_ids_and_bios(profiles, id_key))
+
+    # ---------- Incremental updates ----------
+    def add(self, profile_id, bio):
+        """Append a single profile without refitting the corpus."""
+        if profile_id in self._rows:
+            raise KeyError(f"⚠️ Profile {profile_id!r} is already indexed.")
+        self._pending.append(self.transform([bio]))
+        self._rows[profile_id] = len(self.ids)
+        self.ids.append(profile_id)
+        self.alive = np.append(self.alive, True)
+        self.path = None  # In-memory changes are not on disk until save()
+        self.fingerprint = None
+
+    def update(self, profile_id, bio):
+        """Replace the bio of an indexed profile."""
+        self.delete(profile_id)
+        self.add(profile_id, bio)
+
+    def delete(self, profile_id):
+        """Tombstone a profile so it no longer shows up in results."""
+        try:
+            row = self._rows.pop(profile_id)
+        except KeyError:
+            raise KeyError(f"⚠️ Profile {profile_id!r} is not indexed.")
+        self.alive[row] = False
+        self.path = None
+        self.fingerprint = None
+
+    def compact(self):
+        """Physically drop tombstoned rows from the matrix."""
+        keep = np.flatnonzero(self.alive)
+        self._matrix = self.matrix[keep]
+        self.ids = [self.ids[row] for row in keep]
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self._rows = {profile_id: row for row, profile_id in enumerate(self.ids)}
+        self.path = None
+        self.generation = uuid.uuid4().hex  # Row numbers changed
+
+    # ---------- Querying ----------
+    @property
+    def matrix(self):
+        """CSR matrix with one L2-normalised row per indexed profile."""
+        if self._pending:
+            self._matrix = sparse.vstack([self._matrix] + self._pending, format="csr")
+            self._pending = []
+        return self._matrix
+
+    def transform(self, bios):
+        """Vectorize bios with the fitted vocabulary."""
+        return self.vectorizer.transform(bios).tocsr()
+
+    def similarities(self, user_bio):
+        """
+        Cosine similarity between a bio and every row of the index.
+
+        Rows are L2-normalised, so this is a single sparse dot product.
+        Deleted rows score -inf.
+        """
+        return self.similarity_block(self.transform([user_bio])).ravel()
+
+    def similarity_block(self, queries):
+        """
+        Cosine similarities for a block of already-vectorized queries.
+
+        Args:
+            queries (scipy.sparse matrix): One TF-IDF row per query.
+
+        Returns:
+            np.ndarray: Dense (queries x rows) scores, -inf for deleted rows.
+        """
+        scores = (queries @ self.matrix.T).toarray()
+        scores[:, ~self.alive] = -np.inf
+        return scores
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, profile_id):
+        return profile_id in self._rows
+
+    # ---------- Persistence ----------
+    def save(self, path):
+        """
+        Persist the index as raw CSR arrays plus a JSON metadata file.
+
+        The arrays are written as .npy files so `load()` can memory-map them.
+        Each file is replaced rather than overwritten, so an index loaded
+        memory-mapped can be saved back to the same path.
+        """
+        os.makedirs(path, exist_ok=True)
+        matrix = self.matrix
+        arrays = {
+            "data": matrix.data,
+            "indices": matrix.indices,
+            "indptr": matrix.indptr,
+            "alive": self.alive,
+            "idf": self.vectorizer.idf_,
+        }
+        for name in ARRAY_FILES:
+            save_array(path, f"{name}.npy", arrays[name])
+
+        meta = {
+            "shape": list(matrix.shape),
+            "ids": self.ids,
+            "fingerprint": self.fingerprint,
+            "generation": self.generation,
+            "vocabulary": {term: int(col) for term, col in self.vectorizer.vocabulary_.items()},
+        }
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load an index written by `save()`.
+
+        Args:
+            path (str): Directory the index was saved to.
+            mmap (bool): Memory-map the CSR arrays read-only instead of
+                reading them into memory, so many processes share one copy.
+
+        Returns:
+            ProfileIndex: The loaded index.
+        """
+        try:
+            with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"⚠️ Could not find a profile index at: {path}")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAY_FILES
+        }
+        matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(meta["shape"]),
+            copy=False,
+        )
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(vocabulary=meta["vocabulary"])
+        vectorizer.idf_ = np.asarray(arrays["idf"])
+        return cls(
+            vectorizer, matrix, meta["ids"], alive=arrays["alive"], path=path,
+            fingerprint=meta.get("fingerprint"), generation=meta.get("generation"),
+        )
+
+
+def _ids_and_bios(profiles, id_key):
+    if isinstance(profiles, ProfileStore):
+        return profiles.ids, profiles.column('bio')
+    ids = [profile.get(id_key, i) for i, profile in enumerate(profiles)]
+    return ids, [profile['bio'] for profile in profiles]
+
+
+def _fingerprint(ids, bios):
+    digest = hashlib.sha256()
+    for profile_id, bio in zip(ids, bios):
+        digest.update(json.dumps([profile_id, bio], default=str).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
@@ -0,0 +1,295 @@
+import json
+import os
+
+import numpy as np
+
+
+META_FILE = "store.json"
+
+# Strings with at most this share of distinct values are dictionary-encoded
+CATEGORY_RATIO = 0.25
+
+
+class TextColumn:
+    """Strings packed into one UTF-8 buffer plus an offsets array."""
+
+    kind = "text"
+    array_names = ("buffer", "offsets")
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def encode(cls, values):
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __getitem__(self, row):
+        return bytes(self.buffer[self.offsets[row]:self.offsets[row + 1]]).decode("utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        data = self.buffer.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode("utf-8")
+
+
+class CategoryColumn:
+    """Low-cardinality values stored as integer codes into a category list."""
+
+    kind = "category"
+    array_names = ("codes",)
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = list(categories)
+
+    @classmethod
+    def encode(cls, values):
+        categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        return cls(codes.astype(np.int32), categories.tolist())
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return (self.categories[code] for code in self.codes.tolist())
+
+
+class NumberColumn:
+    """
+    All-int or all-float values stored as a plain int64 or float64 NumPy array.
+
+    Mixed ints and floats are left to JSONColumn, since one float64 array
+    would hand the ints back as floats.
+    """
+
+    kind = "number"
+    array_names = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def encode(cls, values):
+        dtype = np.int64 if all(isinstance(value, int) for value in values) else np.float64
+        return cls(np.array(values, dtype=dtype))
+
+    def __getitem__(self, row):
+        return self.values[row].item()
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+
+class JSONColumn(TextColumn):
+    """Nested values (lists, dicts, mixed types) kept as packed JSON strings."""
+
+    kind = "json"
+
+    @classmethod
+    def encode(cls, values):
+        return super().encode([json.dumps(value, ensure_ascii=False) for value in values])
+
+    def __getitem__(self, row):
+        return json.loads(super().__getitem__(row))
+
+    def __iter__(self):
+        return (json.loads(value) for value in super().__iter__())
+
+
+COLUMN_TYPES = {column.kind: column for column in (TextColumn, CategoryColumn, NumberColumn, JSONColumn)}
+
+
+def save_array(directory, filename, array):
+    """
+    Write one .npy file through a temporary file and a rename.
+
+    Saving in place would truncate a file that an array loaded with
+    `mmap=True` still maps, so the index or store being saved would read
+    garbage. After the rename the old mapping keeps the old file's data.
+    """
+    target = os.path.join(directory, filename)
+    temporary = f"{target}.tmp"
+    with open(temporary, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary, target)
+
+
+def _is_int64(value):
+    return isinstance(value, int) and not isinstance(value, bool) and -2**63 <= value < 2**63
+
+
+def _encode_column(values):
+    """Pick the most compact column type that round-trips the values."""
+    if all(isinstance(value, str) for value in values):
+        if len(set(values)) <= max(1, CATEGORY_RATIO * len(values)):
+            return CategoryColumn.encode(values)
+        return TextColumn.encode(values)
+    if all(isinstance(value, float) for value in values) or all(_is_int64(value) for value in values):
+        return NumberColumn.encode(values)
+    return JSONColumn.encode(values)
+
+
+class ProfileStore:
+    """
+    Columnar, array-backed profile storage.
+
+    Each field lives in one column object backed by a few NumPy arrays
+    instead of one dict per profile. Rows are materialised into dicts only
+    when asked for, and a saved store can be memory-mapped by many workers.
+    """
+
+    def __init__(self, ids, columns, present=None, path=None):
+        self.ids = ids
+        self.columns = columns
+        self.present = present or {}
+        self.path = path
+        self._rows = None
+        self._positions = {}
+
+    @classmethod
+    def from_records(cls, records, id_key="id"):
+        """
+        Build a store from a list of profile dicts.
+
+        Args:
+            records (list): Profile dictionaries.
+            id_key (str): Field used as the profile id. Profiles without it
+                are identified by their position in the list.
+
+        Returns:
+            ProfileStore: The columnar store.
+        """
+        fields = list(dict.fromkeys(key for record in records for key in record))
+        columns, present = {}, {}
+        for field in fields:
+            mask = np.array([field in record for record in records], dtype=bool)
+            columns[field] = _encode_column([record[field] for record in records if field in record])
+            if not mask.all():
+                present[field] = mask
+
+        ids = _encode_column([record.get(id_key, i) for i, record in enumerate(records)])
+        return cls(ids, columns, present)
+
+    # ---------- Access ----------
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        """Materialise one profile as a dict."""
+        profile = {}
+        for field, column in self.columns.items():
+            mask = self.present.get(field)
+            if mask is None:
+                profile[field] = column[row]
+            elif mask[row]:
+                profile[field] = column[self._position(field, row)]
+        return profile
+
+    def _position(self, field, row):
+        """Map a row to its slot in a column that skips missing values."""
+        if field not in self._positions:
+            self._positions[field] = np.cumsum(self.present[field]) - 1
+        return int(self._positions[field][row])
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def column(self, field):
+        """
+        All values of one field, in row order.
+
+        Raises:
+            KeyError: If a profile is missing the field.
+        """
+        if field not in self.columns:
+            raise KeyError(f"⚠️ Profiles have no field: {field}")
+        if field in self.present:
+            raise KeyError(f"⚠️ Some profiles are missing the field: {field}")
+        return self.columns[field]
+
+    def row_of(self, profile_id):
+        """Row number of a profile id."""
+        if self._rows is None:
+            self._rows = {profile_id: row for row, profile_id in enumerate(self.ids)}
+        return self._rows[profile_id]
+
+    def get(self, profile_id, default=None):
+        """Materialise a profile by id."""
+        try:
+            return self[self.row_of(profile_id)]
+        except KeyError:
+            return default
+
+    # ---------- Persistence ----------
+    def save(self, path):
+        """Write every column as .npy arrays plus a JSON layout file."""
+        os.makedirs(path, exist_ok=True)
+        layout = {"ids": self._save_column(path, "ids", self.ids), "columns": {}, "present": list(self.present)}
+        for i, (field, column) in enumerate(self.columns.items()):
+            layout["columns"][field] = self._save_column(path, f"col{i}", column)
+        for i, field in enumerate(self.present):
+            save_array(path, f"present{i}.npy", self.present[field])
+
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as file:
+            json.dump(layout, file)
+        self.path = path
+
+    @staticmethod
+    def _save_column(path, prefix, column):
+        spec = {"kind": column.kind, "prefix": prefix}
+        if isinstance(column, CategoryColumn):
+            spec["categories"] = column.categories
+        for name in column.array_names:
+            save_array(path, f"{prefix}.{name}.npy", getattr(column, name))
+        return spec
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a store written by `save()`.
+
+        Args:
+            path (str): Directory the store was saved to.
+            mmap (bool): Memory-map the column arrays read-only.
+
+        Returns:
+            ProfileStore: The loaded store.
+        """
+        try:
+            with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as file:
+                layout = json.load(file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"⚠️ Could not find a profile store at: {path}")
+
+        mmap_mode = "r" if mmap else None
+
+        def load_column(spec):
+            column_type = COLUMN_TYPES[spec["kind"]]
+            arrays = [
+                np.load(os.path.join(path, f"{spec['prefix']}.{name}.npy"), mmap_mode=mmap_mode)
+                for name in column_type.array_names
+            ]
+            if column_type is CategoryColumn:
+                arrays.append(spec["categories"])
+            return column_type(*arrays)
+
+        columns = {field: load_column(spec) for field, spec in layout["columns"].items()}
+        present = {
+            field: np.load(os.path.join(path, f"present{i}.npy"), mmap_mode=mmap_mode)
+            for i, field in enumerate(layout["present"])
+        }
+        return cls(load_column(layout["ids"]), columns, present, path=path)
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The app's modules and the repo-level `common` package, as the scripts see them
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(APP_DIR), str(APP_DIR.parent)]
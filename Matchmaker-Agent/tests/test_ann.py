@@ -0,0 +1,61 @@
+import pytest
+
+from ann import LSHIndex, recall_at_k
+from benchmarks import corpora
+from index import ProfileIndex
+
+PROFILES = [{"id": f"p{n}", "bio": f"likes hiking coffee and topic{n % 7} with word{n}"} for n in range(50)]
+
+
+@pytest.fixture
+def index():
+    return ProfileIndex.fit(PROFILES)
+
+
+def test_search_after_add_and_delete(index):
+    lsh = LSHIndex.build(index, n_tables=4, n_bits=4)
+    index.delete("p3")
+    index.add("new", "likes hiking coffee and topic3 with word3")
+
+    rows, _ = lsh.search(index, "topic3 word3", k=3, n_probes=4)
+
+    ids = [index.ids[row] for row in rows]
+    assert "new" in ids and "p3" not in ids
+
+
+def test_search_refuses_an_index_compacted_after_build(index):
+    lsh = LSHIndex.build(index)
+    index.delete("p0")
+    index.compact()
+
+    with pytest.raises(ValueError, match="rebuild"):
+        lsh.search(index, "hiking")
+    LSHIndex.build(index).search(index, "hiking")
+
+
+def test_search_refuses_a_refitted_index(index):
+    lsh = LSHIndex.build(index)
+
+    with pytest.raises(ValueError, match="rebuild"):
+        lsh.search(ProfileIndex.fit(PROFILES), "hiking")
+
+
+def test_generation_survives_save_and_load(index, tmp_path):
+    index.save(str(tmp_path / "index"))
+    LSHIndex.build(index).save(str(tmp_path / "lsh"))
+
+    loaded = ProfileIndex.load(str(tmp_path / "index"))
+    rows, scores = LSHIndex.load(str(tmp_path / "lsh")).search(loaded, "topic2 word9", k=1, n_probes=8)
+    assert [loaded.ids[row] for row in rows] == ["p9"]
+
+
+def test_default_build_keeps_most_exact_matches():
+    # The benchmark corpus: realistic bios, where neighbours share only a few words
+    index = ProfileIndex.fit(corpora.profiles(2000))
+    bios = corpora.user_bios(50)
+    lsh = LSHIndex.build(index)
+
+    one_probe = recall_at_k(lsh, index, bios, k=5, n_probes=1)
+    four_probes = recall_at_k(lsh, index, bios, k=5, n_probes=4)
+    assert four_probes >= 0.75
+    assert four_probes > one_probe >= 0.3
@@ -0,0 +1,75 @@
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from index import ProfileIndex
+from tools import find_matches
+
+# The translator also has a top-level `batch` module, so load this app's by path
+_spec = importlib.util.spec_from_file_location("batch", Path(__file__).resolve().parent.parent / "batch.py")
+batch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(batch)
+
+WORDS = "hiking coffee chess painting jazz cooking travel yoga reading cycling films poetry".split()
+
+_rng = random.Random(7)
+PROFILES = [
+    {"id": f"p{n}", "bio": " ".join(_rng.sample(WORDS, 4) + [f"word{n}"])} for n in range(60)
+]
+USERS = [{"bio": " ".join(_rng.sample(WORDS, 3) + [f"word{n}"])} for n in range(0, 60, 3)]
+
+
+@pytest.fixture(autouse=True)
+def matchmaker_batch(monkeypatch):
+    # Pool workers unpickle their task function from sys.modules["batch"]
+    monkeypatch.setitem(sys.modules, "batch", batch)
+
+
+@pytest.fixture
+def index():
+    return ProfileIndex.fit(PROFILES)
+
+
+@pytest.fixture
+def saved_index(tmp_path):
+    path = str(tmp_path / "index")
+    ProfileIndex.fit(PROFILES).save(path)
+    return ProfileIndex.load(path)
+
+
+def pairs(matches_per_user):
+    return [[(match.profile_id, match.score) for match in matches] for matches in matches_per_user]
+
+
+def expected(index, top_n):
+    return pairs(find_matches(user, PROFILES, top_n=top_n, index=index) for user in USERS)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1024])
+def test_matches_for_everyone_agrees_with_find_matches(index, chunk_size):
+    got = batch.matches_for_everyone(USERS, index, top_n=3, chunk_size=chunk_size)
+    assert pairs(got) == expected(index, 3)
+
+
+@pytest.mark.parametrize("fixture", ["index", "saved_index"])
+def test_process_pool_agrees_with_find_matches(request, fixture):
+    index = request.getfixturevalue(fixture)
+    got = batch.matches_for_everyone(USERS, index, top_n=5, chunk_size=4, workers=2)
+    assert pairs(got) == expected(index, 5)
+
+
+def test_batch_top_k_skips_deleted_profiles(index):
+    index.delete("p0")
+    index.delete("p3")
+    rows, _ = batch.batch_top_k(index, [user["bio"] for user in USERS], k=len(PROFILES), chunk_size=7)
+    returned = {index.ids[row] for row in rows.ravel() if row >= 0}
+    assert not returned & {"p0", "p3"}
+    assert pairs(batch.matches_for_everyone(USERS, index, top_n=3, chunk_size=7)) == expected(index, 3)
+
+
+def test_batch_top_k_rejects_empty_chunks(index):
+    with pytest.raises(ValueError):
+        batch.batch_top_k(index, ["coffee"], chunk_size=0)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from index import ProfileIndex
+
+PROFILES = [
+    {"id": "a", "bio": "hiking and coffee on weekends"},
+    {"id": "b", "bio": "chess and board games"},
+    {"id": "c", "bio": "coffee lover and painter"},
+    {"id": "d", "bio": "painting landscapes"},
+]
+
+
+@pytest.fixture
+def saved_index(tmp_path):
+    path = str(tmp_path / "index")
+    ProfileIndex.fit(PROFILES).save(path)
+    return path
+
+
+def test_load_round_trips_scores(saved_index):
+    fitted = ProfileIndex.fit(PROFILES)
+    loaded = ProfileIndex.load(saved_index)
+    np.testing.assert_allclose(loaded.similarities("coffee hiking"), fitted.similarities("coffee hiking"))
+
+
+def test_mmap_loaded_index_can_be_saved_in_place(saved_index):
+    index = ProfileIndex.load(saved_index, mmap=True)
+    expected = index.similarities("coffee hiking")
+    expected[1] = -np.inf
+
+    index.delete("b")
+    index.save(saved_index)
+
+    np.testing.assert_allclose(index.similarities("coffee hiking"), expected)
+    np.testing.assert_allclose(ProfileIndex.load(saved_index).similarities("coffee hiking"), expected)
+
+
+def test_load_index_refits_when_profiles_change(tmp_path, monkeypatch):
+    from tools import load_index
+
+    path = str(tmp_path / "index")
+    assert load_index(PROFILES, path).ids == ["a", "b", "c", "d"]
+
+    fits = []
+    fit = ProfileIndex.fit
+    monkeypatch.setattr(ProfileIndex, "fit", classmethod(lambda cls, *args: fits.append(args) or fit(*args)))
+    load_index(PROFILES, path)
+    assert not fits  # Unchanged profiles reuse the saved index
+
+    edited = PROFILES[:2] + [{"id": "e", "bio": "surfing and coffee"}]
+    index = load_index(edited, path)
+    assert len(fits) == 1
+    assert index.ids == ["a", "b", "e"]
+    assert ProfileIndex.load(path).fingerprint == ProfileIndex.fingerprint_of(edited)
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils import BulkMatchScorer, calculate_match_score, highlight_match, highlight_matches
+
+FIELDS = ("gender", "city", "religion", "diet", "smoking", "pets", "language")
+VALUES = ("yes", "no", "Lahore", "karachi", "vegan", "", "cats", "dogs")
+
+
+def random_profile(rng):
+    """A few fields, with the case and spacing variations the scorer normalises away."""
+    profile = {}
+    for field in rng.sample(FIELDS, rng.randint(0, len(FIELDS))):
+        value = rng.choice(VALUES)
+        profile[field] = rng.choice([value, value.upper(), f"  {value} ", value.title()])
+    return profile
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bulk_scores_equal_scalar_scores(seed):
+    rng = random.Random(seed)
+    corpus = [random_profile(rng) for _ in range(60)]
+    users = [random_profile(rng) for _ in range(25)]
+
+    scores = BulkMatchScorer(corpus).score_block(users)
+
+    expected = [[calculate_match_score(user, profile) for profile in corpus] for user in users]
+    np.testing.assert_array_equal(scores, expected)
+    assert [BulkMatchScorer(corpus).score(users[0]).tolist()] == expected[:1]
+
+
+def test_every_achievable_score_is_reproduced():
+    # Totals of 1..7 fields reach every score the scalar function can return,
+    # including thirds and sevenths that truncate the same way on both sides
+    corpus = [{field: "x" for field in FIELDS}]
+    for total in range(1, len(FIELDS) + 1):
+        for matching in range(total + 1):
+            user = {field: "x" if n < matching else "y" for n, field in enumerate(FIELDS[:total])}
+            assert BulkMatchScorer(corpus).score(user)[0] == calculate_match_score(user, corpus[0])
+
+
+def test_labels_equal_scalar_labels_at_the_thresholds():
+    scores = [0, 1, 39, 40, 41, 59, 60, 61, 79, 80, 81, 99, 100]
+
+    assert highlight_matches(scores).tolist() == [highlight_match(score) for score in scores]
+    assert highlight_matches(np.array([[39, 40], [79, 80]])).tolist() == [
+        [highlight_match(39), highlight_match(40)],
+        [highlight_match(79), highlight_match(80)],
+    ]
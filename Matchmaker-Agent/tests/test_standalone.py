@@ -0,0 +1,13 @@
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_batch_job_imports_without_the_app_script():
+    # A fresh interpreter in the app directory, as a cron job would run it
+    completed = subprocess.run(
+        [sys.executable, "-c", "import batch, tools"], cwd=APP_DIR, capture_output=True, text=True
+    )
+    assert completed.returncode == 0, completed.stderr
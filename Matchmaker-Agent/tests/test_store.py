@@ -0,0 +1,33 @@
+import pytest
+
+from store import CategoryColumn, JSONColumn, NumberColumn, ProfileStore, TextColumn
+
+RECORDS = [
+    {"id": 1, "bio": "hiking", "age": 25, "height": 1.7, "score": 3, "city": "Lahore", "tags": ["a"]},
+    {"id": 2, "bio": "chess", "age": 31, "height": 1.8, "score": 4.5, "city": "Lahore"},
+    {"id": 3, "bio": "coffee", "age": 40, "height": 1.6, "score": 7, "big": 2**70, "city": "Lahore", "tags": []},
+    {"id": 4, "bio": "painting", "age": 22, "height": 2.0, "score": 1.0, "city": "Lahore", "tags": None},
+]
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_records_round_trip_with_their_types(tmp_path, mmap):
+    store = ProfileStore.from_records(RECORDS)
+    store.save(str(tmp_path))
+
+    for loaded in (store, ProfileStore.load(str(tmp_path), mmap=mmap)):
+        profiles = list(loaded)
+        assert profiles == RECORDS
+        assert [type(profile["score"]) for profile in profiles] == [int, float, int, float]
+        assert loaded.get(3) == RECORDS[2]
+
+
+def test_column_types():
+    columns = ProfileStore.from_records(RECORDS).columns
+
+    assert isinstance(columns["bio"], TextColumn)
+    assert isinstance(columns["city"], CategoryColumn)
+    assert isinstance(columns["age"], NumberColumn) and columns["age"].values.dtype.kind == "i"
+    assert isinstance(columns["height"], NumberColumn) and columns["height"].values.dtype.kind == "f"
+    assert isinstance(columns["score"], JSONColumn)  # Mixed ints and floats
+    assert isinstance(columns["big"], JSONColumn)  # Beyond int64
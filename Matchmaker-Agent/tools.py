@@ -1,40 +1,102 @@
 import json
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from index import ProfileIndex, top_k
+from store import ProfileStore
+
+
+class Match:
+    """A scored match that refers to its profile by id instead of copying it."""
+
+    __slots__ = ("profile_id", "score")
+
+    def __init__(self, profile_id, score):
+        self.profile_id = profile_id
+        self.score = score  # Percent format
+
+    def __repr__(self):
+        return f"Match(profile_id={self.profile_id!r}, score={self.score})"
 
 
 def load_profiles(json_path="data/profiles.json"):
     """
-    Load existing profiles from a JSON file.
-    
+    Load existing profiles into a columnar ProfileStore.
+
     Args:
-        json_path (str): Path to the profiles.json file.
-    
+        json_path (str): Path to the profiles.json file, or to a directory
+            written by `ProfileStore.save()` which is memory-mapped.
+
     Returns:
-        list: A list of user profiles (dicts).
+        ProfileStore: The profiles, one array-backed column per field.
     """
+    if os.path.isdir(json_path):
+        return ProfileStore.load(json_path)
+
     try:
         with open(json_path, "r", encoding="utf-8") as file:
-            return json.load(file)
+            return ProfileStore.from_records(json.load(file))
     except FileNotFoundError:
         raise FileNotFoundError(f"⚠️ Could not find file at: {json_path}")
     except json.JSONDecodeError:
         raise ValueError("❌ Failed to decode JSON. Check your file formatting.")
 
 
-def compute_similarity(user_bio, profiles):
+def load_index(profiles, index_path="data/profile_index"):
+    """
+    Load the persisted profile index, building and saving it on first use.
+
+    The index is refitted and saved again when it was built from different
+    profiles, e.g. after profiles.json was edited.
+
+    Args:
+        profiles (ProfileStore | list): Profiles the index must cover.
+        index_path (str): Directory holding the saved index.
+
+    Returns:
+        ProfileIndex: An index over exactly these profiles.
+    """
+    expected = ProfileIndex.fingerprint_of(profiles)
+    try:
+        index = ProfileIndex.load(index_path)
+        if index.fingerprint == expected:
+            return index
+    except FileNotFoundError:
+        pass
+    index = ProfileIndex.fit(profiles)
+    index.save(index_path)
+    return index
+
+
+@metrics.traced("matchmaker_similarity")
+def compute_similarity(user_bio, profiles, index=None):
     """
     Compute cosine similarity between the user's bio and each profile's bio.
 
     Args:
         user_bio (str): The user's bio text.
-        profiles (list): List of profiles with 'bio' field.
+        profiles (ProfileStore | list): Profiles with a 'bio' field.
+        index (ProfileIndex, optional): Prebuilt index over the profiles.
+            When given, only the user's bio is vectorized.
 
     Returns:
-        list: Similarity scores between user bio and profile bios.
+        np.ndarray: Similarity scores between user bio and profile bios
+            (one per index row when an index is used).
     """
-    bios = [profile['bio'] for profile in profiles]
-    all_bios = [user_bio] + bios  # Combine for joint vectorization
+    if index is not None:
+        return index.similarities(user_bio)
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    all_bios = [user_bio, *_bios(profiles)]  # Combine for joint vectorization
 
     vectorizer = TfidfVectorizer()
     tfidf_matrix = vectorizer.fit_transform(all_bios)
@@ -43,24 +105,48 @@ def compute_similarity(user_bio, profiles):
     return similarities
 
 
-def find_matches(user_input, profiles, top_n=3):
+def find_matches(user_input, profiles, top_n=3, index=None, ann=None, n_probes=1):
     """
     Find top N most similar matches for the user.
 
+    The profiles are never modified, so one store can be shared by
+    concurrent requests. Look matched profiles up with `profiles.get(id)`.
+
     Args:
         user_input (dict): Dictionary containing user's 'bio' key.
-        profiles (list): List of profile dictionaries with 'bio' key.
+        profiles (ProfileStore | list): Profiles with a 'bio' field.
         top_n (int): Number of top matches to return.
+        index (ProfileIndex, optional): Prebuilt index over the profiles.
+        ann (LSHIndex, optional): Approximate index built from `index`.
+            Only rows sharing a hash bucket with the query are scored.
+        n_probes (int): Buckets probed per LSH table; higher means better
+            recall and slower queries.
 
     Returns:
-        list: List of matched profiles sorted by similarity score.
+        list: Match records sorted by similarity score.
     """
-    similarities = compute_similarity(user_input['bio'], profiles)
+    if ann is not None:
+        if index is None:
+            raise ValueError("❌ An ANN search needs the ProfileIndex it was built from.")
+        rows, scores = ann.search(index, user_input['bio'], k=top_n, n_probes=n_probes)
+    else:
+        rows, scores = top_k(compute_similarity(user_input['bio'], profiles, index=index), top_n)
+
+    ids = index.ids if index is not None else _ids(profiles)
+    return [
+        Match(ids[row], round(float(score) * 100, 2))  # Percent format
+        for row, score in zip(rows, scores)
+        if np.isfinite(score)
+    ]
+
+
+def _bios(profiles):
+    if isinstance(profiles, ProfileStore):
+        return list(profiles.column('bio'))
+    return [profile['bio'] for profile in profiles]
 
-    # Add similarity score to each profile
-    for i, score in enumerate(similarities):
-        profiles[i]['score'] = round(score * 100, 2)  # Percent format
 
-    # Sort by score descending and return top N matches
-    matches = sorted(profiles, key=lambda x: x['score'], reverse=True)[:top_n]
-    return matches
+def _ids(profiles):
+    if isinstance(profiles, ProfileStore):
+        return profiles.ids
+    return [profile.get("id", i) for i, profile in enumerate(profiles)]
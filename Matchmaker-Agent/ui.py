@@ -1,5 +1,5 @@
 import streamlit as st
-from agent import get_match_recommendation  # ✅ Updated function name
+from agent import get_agent
 import os
 from dotenv import load_dotenv
 
@@ -65,20 +65,25 @@ with st.container():
         if not name or not interests or not looking_for:
             st.warning("Please fill out all fields before submitting.")
         else:
-            with st.spinner("Thinking... 💭"):
-                prompt = (
-                    f"My name is {name}, I'm a {age}-year-old {gender}. "
-                    f"My interests include {interests}. "
-                    f"I'm looking for a partner who is {looking_for}."
-                )
-                try:
-                    # ✅ Updated function call
-                    reply = get_match_recommendation(prompt)
-                    st.success("💘 Here's your potential match:")
-                    st.write(reply)
-                except Exception as e:
-                    st.error("⚠️ An error occurred. Please try again later.")
-                    st.exception(e)
+            form = {
+                "name": name,
+                "age": age,
+                "gender": gender,
+                "interests": interests,
+                "looking_for": looking_for,
+            }
+            try:
+                agent = get_agent()
+                with st.spinner("Finding compatible profiles... 💭"):
+                    candidates = agent.candidates(form)
+                st.success("💘 Here's your potential match:")
+                if candidates:
+                    st.caption(f"Based on the {len(candidates)} most compatible profiles")
+                # Tokens are shown as they arrive; repeat submissions come from the cache
+                st.write_stream(agent.stream(form, candidates))
+            except Exception as e:
+                st.error("⚠️ An error occurred. Please try again later.")
+                st.exception(e)
 
     st.markdown('</div>', unsafe_allow_html=True)
 
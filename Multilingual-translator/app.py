@@ -1,14 +1,20 @@
 import streamlit as st
+import json
 import os
+import sys
+from collections import Counter
+from pathlib import Path
 from dotenv import load_dotenv
-from memory import create_table, save_translation, get_all_translations, clear_translations
-import requests
-from langdetect import detect
-from langcodes import Language
-from streamlit_webrtc import webrtc_streamer, AudioProcessorBase
-import speech_recognition as sr
-import av
-import numpy as np
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from memory import create_table, get_translations_page, clear_translations
+from cache import get_cache
+from batch import read_segments, translate_segments
+from client import get_client
+from common.langid import get_identifier
+from common.speech import audio_processor_class
 from enum import Enum  # ✅ workaround for StreamingMode
 
 # ✅ Manually define the StreamingMode enum
@@ -32,7 +38,10 @@ with st.sidebar:
     st.markdown("🎙️ Speech-to-text supported")
     if st.button("🗑️ Clear All Memory"):
         clear_translations()
+        get_cache().clear()
         st.success("All stored translations deleted.")
+    cache_stats = get_cache().stats()
+    st.caption(f"⚡ Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
 # Title
 st.title("🌍 Multilingual Translator")
@@ -44,39 +53,52 @@ create_table()
 # 🎤 Speech-to-text using WebRTC
 st.subheader("🎤 Speak Instead (Optional)")
 
-class AudioProcessor(AudioProcessorBase):
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
+# How often a running microphone stream is checked for recognised speech
+SPEECH_POLL_SECONDS = 1
 
-    def recv(self, frame: av.AudioFrame) -> av.AudioFrame:
-        audio = frame.to_ndarray()
-        audio = np.mean(audio, axis=1).astype(np.int16).tobytes()
-        try:
-            audio_data = sr.AudioData(audio, frame.sample_rate, 2)
-            text = self.recognizer.recognize_google(audio_data)
-            st.session_state["user_input"] = text
-            st.success(f"🎙️ You said: {text}")
-        except sr.UnknownValueError:
-            pass
-        return frame
-
-# ✅ Fixed: using enum value
-webrtc_streamer(
-    key="speech",
-    mode=StreamingMode.SENDONLY,
-    audio_processor_factory=AudioProcessor
-)
+
+@st.fragment(run_every=SPEECH_POLL_SECONDS)
+def listen_for_speech(speech):
+    """Rerun the page once the background recognizer has heard something."""
+    texts = speech.poll()
+    if texts:
+        st.session_state["user_input"] = texts[-1]
+        st.session_state["heard"] = texts[-1]
+        st.rerun()
+
+
+# The microphone widget shows by default, as it always has; streamlit-webrtc
+# (with PyAV and aiortc) is only imported while voice input is ticked
+if st.checkbox("🎙️ Use voice input", value=True, key="voice_input"):
+    from streamlit_webrtc import webrtc_streamer
+
+    # ✅ Fixed: using enum value
+    speech_ctx = webrtc_streamer(
+        key="speech",
+        mode=StreamingMode.SENDONLY,
+        audio_processor_factory=audio_processor_class()
+    )
+
+    # Speech is recognised in the background; a fragment checks for it
+    # while the microphone is on and reruns the page with the text
+    if speech_ctx.state.playing and speech_ctx.audio_processor:
+        listen_for_speech(speech_ctx.audio_processor.speech)
+    if "heard" in st.session_state:
+        st.success(f"🎙️ You said: {st.session_state.pop('heard')}")
 
 # Text input field
 user_input = st.text_area("✍️ Enter text (or use mic above)", st.session_state.get("user_input", ""))
 
 # Auto-detect source language
 if user_input:
+    # Seeded and memoized, so keystroke reruns reuse the answer
     try:
-        detected_code = detect(user_input)
-        detected_lang = Language.get(detected_code).display_name()
-        st.info(f"🌐 Detected Language: **{detected_lang}** ({detected_code})")
-    except:
+        detection = get_identifier().detect(user_input)
+    except Exception:
+        detection = None
+    if detection:
+        st.info(f"🌐 Detected Language: {detection.flag} **{detection.name}** ({detection.code})")
+    else:
         st.warning("⚠️ Could not auto-detect the language.")
 
 # Target language input
@@ -88,29 +110,87 @@ if st.button("🔁 Translate"):
         instruction = f"You are a multilingual translator. Detect the source language and translate the following into {target_language}. Respond only with the translated result."
 
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={gemini_api_key}"
-            headers = {"Content-Type": "application/json"}
-            data = {
-                "contents": [ { "parts": [ { "text": instruction + "\n" + user_input } ] } ]
-            }
+            cache = get_cache()
+            translated_text = cache.get(user_input, target_language)
 
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            translated_text = response.json()['candidates'][0]['content']['parts'][0]['text']
+            if translated_text is None:
+                translated_text = get_client(gemini_api_key).generate(instruction + "\n" + user_input)
+                cache.put(user_input, target_language, translated_text)
+            else:
+                st.caption("⚡ Served from translation memory")
 
             st.success(f"🔤 Translated to {target_language}:")
             st.write(translated_text)
 
-            save_translation(user_input, translated_text, target_language)
-
         except Exception as e:
             st.error(f"❌ Error: {e}")
     else:
         st.warning("Please fill both the input text and target language.")
 
+# 📄 Batch translation
+with st.expander("📄 Batch Translate a File"):
+    batch_file = st.file_uploader("Upload segments (.txt, .csv or .jsonl)", type=["txt", "csv", "jsonl"])
+    batch_language = st.text_input("🌐 Translate file to", key="batch_language")
+    if st.button("🔁 Translate File") and batch_file and batch_language:
+        try:
+            segments = read_segments(batch_file.name, batch_file.getvalue())
+            # Source-language mix from an evenly spread sample of the file
+            sample = segments[::max(1, len(segments) // 200)]
+            languages = Counter(
+                detection.name for detection in get_identifier().detect_many(sample) if detection
+            )
+            if languages:
+                st.caption("🌐 Source languages: " + ", ".join(
+                    f"{name} ({count / len(sample):.0%})" for name, count in languages.most_common(5)
+                ))
+            progress = st.progress(0.0, text=f"Translating {len(segments)} segments...")
+            translations = translate_segments(
+                segments,
+                batch_language,
+                get_client(gemini_api_key),
+                on_progress=lambda done, total: progress.progress(done / total if total else 1.0),
+            )
+            st.success(f"🔤 Translated {len(segments)} segments to {batch_language}.")
+            st.download_button(
+                "⬇️ Download translations (.jsonl)",
+                data="\n".join(
+                    json.dumps({"text": text, "translation": translated}, ensure_ascii=False)
+                    for text, translated in zip(segments, translations)
+                ),
+                file_name="translations.jsonl",
+                mime="application/jsonl",
+            )
+        except Exception as e:
+            st.error(f"❌ Error: {e}")
+
 # Display Memory
-translations = get_all_translations()
-if translations:
-    with st.expander("🧠 View Your Stored Translations"):
-        for t in reversed(translations):
-            st.markdown(f"- **{t[1]}** → *({t[3]})* ➜ {t[2]}")
+with st.expander("🧠 View Your Stored Translations"):
+    lang_col, search_col = st.columns(2)
+    history_lang = lang_col.text_input("Filter by target language", key="history_lang")
+    history_search = search_col.text_input("Search stored translations", key="history_search")
+
+    # Cursor stack for keyset pagination; reset whenever the filters change
+    history_filters = (history_lang.strip(), history_search.strip())
+    if st.session_state.get("history_filters") != history_filters:
+        st.session_state["history_filters"] = history_filters
+        st.session_state["history_pages"] = [None]
+    history_pages = st.session_state["history_pages"]
+
+    translations, next_cursor = get_translations_page(
+        before=history_pages[-1], target_lang=history_lang, search=history_search
+    )
+    if not translations:
+        st.caption("No stored translations found.")
+    # One batched, memoized call for the whole page
+    detections = get_identifier().detect_many([t[1] for t in translations])
+    for t, detection in zip(translations, detections):
+        flag = f"{detection.flag} " if detection else ""
+        st.markdown(f"- {flag}**{t[1]}** → *({t[3]})* ➜ {t[2]}")
+
+    newer_col, older_col = st.columns(2)
+    if len(history_pages) > 1 and newer_col.button("◀ Newer"):
+        history_pages.pop()
+        st.rerun()
+    if next_cursor and older_col.button("Older ▶"):
+        history_pages.append(next_cursor)
+        st.rerun()
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache import cache_key, get_cache
+
+# Gemini's output limit (~8k tokens) is what bounds a request, not its much
+# larger input window, so requests are packed to a conservative size
+MAX_REQUEST_CHARS = 12_000
+MAX_REQUEST_SEGMENTS = 100
+MAX_IN_FLIGHT = 4
+
+MARKER = "<<<{}>>>"
+MARKER_PATTERN = re.compile(r"^[ \t]*<<<(\d+)>>>[ \t]*$", re.MULTILINE)
+
+
+# ---------- Reading files ----------
+def read_segments(file_name, data):
+    """
+    Split an uploaded .txt, .csv or .jsonl file into text segments.
+
+    Text files give one segment per non-empty line. CSV files use the
+    `text` column if there is one, otherwise the first column. JSONL lines
+    must be strings or objects with a string `text` field; anything else
+    raises ValueError naming the line.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    extension = os.path.splitext(file_name)[1].lower()
+
+    if extension == ".csv":
+        rows = list(csv.reader(io.StringIO(data)))
+        if not rows:
+            return []
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "text" in header:
+            column, rows = header.index("text"), rows[1:]
+        else:
+            column = 0
+        segments = [row[column] for row in rows if len(row) > column]
+    elif extension == ".jsonl":
+        segments = []
+        for number, line in enumerate(data.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"❌ Line {number} is not valid JSON.")
+            if isinstance(record, dict):
+                record = record.get("text")
+            if not isinstance(record, str):
+                raise ValueError(f"❌ Line {number} must be a string or an object with a text string.")
+            segments.append(record)
+    else:
+        segments = data.splitlines()
+
+    return [segment for segment in segments if segment.strip()]
+
+
+# ---------- Packing ----------
+def pack_segments(segments, max_chars=MAX_REQUEST_CHARS, max_segments=MAX_REQUEST_SEGMENTS):
+    """
+    Group segments into as few requests as the size limits allow.
+
+    Returns:
+        list: Batches of (segment_number, text) pairs.
+    """
+    batches, current, size = [], [], 0
+    for number, text in enumerate(segments):
+        cost = len(text) + len(MARKER.format(number)) + 1
+        if current and (size + cost > max_chars or len(current) == max_segments):
+            batches.append(current)
+            current, size = [], 0
+        current.append((number, text))
+        size += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_prompt(batch, target_lang):
+    instruction = (
+        f"You are a multilingual translator. Translate each segment below into {target_lang}. "
+        "Each segment starts with a marker line like <<<0>>>. Copy every marker line exactly, "
+        "followed by the translation of its segment. Respond only with the markers and translations."
+    )
+    body = "\n".join(f"{MARKER.format(number)}\n{text}" for number, text in batch)
+    return instruction + "\n\n" + body
+
+
+def split_response(text):
+    """Map segment numbers back to their translations."""
+    parts = MARKER_PATTERN.split(text)
+    # parts = [preamble, number, translation, number, translation, ...]
+    return {int(number): translation.strip() for number, translation in zip(parts[1::2], parts[2::2])}
+
+
+# ---------- Requests ----------
+def _translate_batch(batch, target_lang, client):
+    """Translate one packed batch, retrying segments whose marker was lost one by one."""
+    translated = split_response(client.generate(build_prompt(batch, target_lang)))
+    return {
+        number: translated.get(number) or _single(text, target_lang, client)
+        for number, text in batch
+    }
+
+
+def _single(text, target_lang, client):
+    instruction = (
+        f"You are a multilingual translator. Detect the source language and translate the following "
+        f"into {target_lang}. Respond only with the translated result."
+    )
+    return client.generate(instruction + "\n" + text).strip()
+
+
+def translate_segments(
+    segments,
+    target_lang,
+    client,
+    cache=None,
+    max_chars=MAX_REQUEST_CHARS,
+    max_in_flight=MAX_IN_FLIGHT,
+    on_progress=None,
+):
+    """
+    Translate many segments with as few Gemini requests as possible.
+
+    Segments already in the translation memory (or repeated in the input)
+    are not sent. The rest are packed into marker-delimited requests that
+    run concurrently, at most `max_in_flight` at a time, and each finished
+    request is written back to the memory in one transaction.
+
+    Args:
+        segments (list): Texts to translate.
+        target_lang (str): Target language name.
+        client (GeminiClient): Pooled client; point its api_url at a local
+            stub server for testing.
+        cache (TranslationCache): Defaults to the process-wide cache.
+        max_chars (int): Size limit of one packed request.
+        max_in_flight (int): Concurrent requests.
+        on_progress (callable): Called with (done, total) segment counts.
+
+    Returns:
+        list: Translations aligned with `segments`.
+    """
+    cache = cache or get_cache()
+
+    # One representative text per cache key
+    unique = {}
+    for text in segments:
+        unique.setdefault(cache_key(text, target_lang, cache.model), text)
+
+    known = cache.get_many(unique.values(), target_lang)
+    results = {key: known[text] for key, text in unique.items() if text in known}
+    pending = [(key, text) for key, text in unique.items() if key not in results]
+
+    total, done = len(unique), len(results)
+    if on_progress:
+        on_progress(done, total)
+
+    batches = pack_segments([text for _, text in pending], max_chars=max_chars)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = {
+            pool.submit(_translate_batch, batch, target_lang, client): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            translated = future.result()
+            pairs = [(pending[number][1], translated[number]) for number, _ in futures[future]]
+            cache.put_many(pairs, target_lang)
+            for number, _ in futures[future]:
+                results[pending[number][0]] = translated[number]
+
+            done += len(translated)
+            if on_progress:
+                on_progress(done, total)
+
+    return [results[cache_key(text, target_lang, cache.model)] for text in segments]
@@ -0,0 +1,123 @@
+import hashlib
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+from memory import lookup_translation, lookup_translations, save_translation, save_translations
+
+MODEL_NAME = "gemini-2.0-flash"
+
+# Size budget of the in-process layer, counted in UTF-8 bytes of output
+FRONT_MAX_BYTES = 8 * 1024 * 1024
+FRONT_MAX_ENTRIES = 10_000
+
+
+def normalise_text(text):
+    """NFC, unified line endings, collapsed runs of spaces, trimmed ends."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return re.sub(r"[ \t]+", " ", text).strip()
+
+
+def normalise_language(target_lang):
+    """Case- and spacing-insensitive target language, e.g. ' french' -> 'french'."""
+    return " ".join(target_lang.casefold().split())
+
+
+def cache_key(text, target_lang, model=MODEL_NAME):
+    """Content address of a translation request."""
+    payload = "\x1f".join((model, normalise_language(target_lang), normalise_text(text)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Two-layer translation cache: an in-process LRU in front of the SQLite
+    memory, which is indexed on the cache key. A hit in either layer means
+    no Gemini request.
+    """
+
+    def __init__(self, model=MODEL_NAME, max_bytes=FRONT_MAX_BYTES, max_entries=FRONT_MAX_ENTRIES):
+        self.model = model
+        self.front = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, text, target_lang):
+        key = cache_key(text, target_lang, self.model)
+        translated = self.front.get(key)
+        if translated is None:
+            translated = lookup_translation(key)
+            if translated is None:
+                self.misses += 1
+                return None
+            self.db_hits += 1
+            self.front.put(key, translated)
+        return translated
+
+    def put(self, text, target_lang, translated_text):
+        key = cache_key(text, target_lang, self.model)
+        save_translation(text, translated_text, target_lang, cache_key=key)
+        self.front.put(key, translated_text)
+
+    def get_many(self, texts, target_lang):
+        """
+        Cached outputs for many texts with one database query.
+
+        Returns:
+            dict: {text: translated_text} for every text that was cached.
+        """
+        keys = {text: cache_key(text, target_lang, self.model) for text in texts}
+        found = {}
+        missing = {}
+        for text, key in keys.items():
+            translated = self.front.get(key)
+            if translated is None:
+                missing.setdefault(key, []).append(text)
+            else:
+                found[text] = translated
+
+        stored = lookup_translations(missing) if missing else {}
+        for key, translated in stored.items():
+            found.update(dict.fromkeys(missing[key], translated))
+            self.front.put(key, translated)
+        self.db_hits += len(stored)
+        self.misses += len(missing) - len(stored)
+        return found
+
+    def put_many(self, pairs, target_lang):
+        """Store many (text, translated_text) pairs in one transaction."""
+        rows = []
+        for text, translated in pairs:
+            key = cache_key(text, target_lang, self.model)
+            rows.append((text, translated, target_lang, key))
+            self.front.put(key, translated)
+        save_translations(rows)
+
+    def clear(self):
+        """Drop the in-process layer, e.g. after the memory table is cleared."""
+        self.front.clear()
+
+    def stats(self):
+        hits = self.front.hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.front.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+@shared
+def get_cache():
+    cache = TranslationCache()
+    metrics.watch_cache("translator_memory", cache.front.stats)
+    return cache
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cache import MODEL_NAME
+from common import metrics
+from common.shared import shared
+
+# Override to point the translator at a local fake server
+API_URL = os.getenv(
+    "GEMINI_API_URL",
+    f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent",
+)
+
+CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", 60))
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 20
+POOL_SIZE = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeminiClient:
+    """
+    Thread-safe Gemini generateContent client.
+
+    One keep-alive session is shared by every caller, so repeated requests
+    skip the TCP/TLS handshake. Every request has connect and read timeouts,
+    and 429/5xx responses or dropped connections are retried with
+    exponential backoff and jitter (honouring Retry-After when sent).
+    """
+
+    def __init__(
+        self,
+        api_key,
+        api_url=API_URL,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        backoff=BACKOFF_SECONDS,
+        pool_size=POOL_SIZE,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers["Content-Type"] = "application/json"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @metrics.traced("translator_gemini")
+    def generate(self, prompt):
+        """Send one prompt and return the response text."""
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        for attempt in range(self.max_retries + 1):
+            last_try = attempt == self.max_retries
+            try:
+                response = self.session.post(
+                    self.api_url, params={"key": self.api_key}, json=payload, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.count("http_requests_total", service="gemini", status=type(e).__name__)
+                if last_try:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            metrics.count("http_requests_total", service="gemini", status=response.status_code)
+            if response.status_code in RETRY_STATUSES and not last_try:
+                time.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+                continue
+            response.raise_for_status()
+            return response.json()['candidates'][0]['content']['parts'][0]['text']
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), MAX_BACKOFF_SECONDS)
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        delay = min(self.backoff * 2 ** attempt, MAX_BACKOFF_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncGeminiClient:
+    """
+    asyncio front end for GeminiClient.
+
+    Each request runs the pooled, retrying sync client in a worker thread,
+    so several translations can be awaited together; `max_in_flight` caps
+    how many are sent at once.
+    """
+
+    def __init__(self, client, max_in_flight=POOL_SIZE):
+        self.client = client
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def generate(self, prompt):
+        async with self._slots:
+            return await asyncio.to_thread(self.client.generate, prompt)
+
+    async def generate_many(self, prompts):
+        """Responses for many prompts, in order."""
+        return await asyncio.gather(*(self.generate(prompt) for prompt in prompts))
+
+
+@shared
+def get_client(api_key, api_url=API_URL):
+    """One client per key and endpoint, so its connection pool is reused."""
+    return GeminiClient(api_key, api_url)
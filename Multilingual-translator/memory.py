@@ -1,42 +1,301 @@
+import queue
 import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.shared import shared
 
 DB_NAME = "translator_memory.db"
+POOL_SIZE = 4
+PAGE_SIZE = 20
 
-def create_table():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''
+# Applied once per connection. WAL lets readers and one writer work at the
+# same time, and busy_timeout waits for a lock instead of failing at once.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+)
+
+# Every translation saved before the cache existed came from this model
+BACKFILL_MODEL = "gemini-2.0-flash"
+
+
+def _backfill_cache_keys(conn):
+    """
+    Key rows saved before the cache existed so they are reused as cache
+    hits. Where old history repeats an input, the newest output wins, as
+    it does for new saves.
+    """
+    from cache import cache_key  # cache.py imports this module
+
+    newest = {}
+    rows = conn.execute(
+        "SELECT id, input, target_lang FROM translations "
+        "WHERE cache_key IS NULL AND input IS NOT NULL AND target_lang IS NOT NULL ORDER BY id"
+    )
+    for row_id, text, target_lang in rows:
+        newest[cache_key(text, target_lang, BACKFILL_MODEL)] = row_id
+    conn.executemany("UPDATE translations SET cache_key = ? WHERE id = ?", newest.items())
+
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Each entry is a tuple of steps run in one transaction: SQL statements, or
+# functions taking the connection for steps SQL cannot express.
+MIGRATIONS = (
+    (
+        '''
         CREATE TABLE IF NOT EXISTS translations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             input TEXT,
             output TEXT,
             target_lang TEXT
         )
-    ''')
-    conn.commit()
-    conn.close()
-
-def save_translation(user_input, translated_text, target_lang):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO translations (input, output, target_lang)
-        VALUES (?, ?, ?)
-    ''', (user_input, translated_text, target_lang))
-    conn.commit()
-    conn.close()
+        ''',
+    ),
+    (
+        # Content-addressed translation cache, see cache.py
+        "ALTER TABLE translations ADD COLUMN cache_key TEXT",
+        _backfill_cache_keys,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_translations_cache_key ON translations (cache_key)",
+    ),
+    (
+        # Keyset-paginated history, filtering by language and full-text search.
+        # Rows saved before this migration sort as the oldest.
+        "ALTER TABLE translations ADD COLUMN created_at REAL NOT NULL DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_translations_created ON translations (created_at, id)",
+        """
+        CREATE INDEX IF NOT EXISTS idx_translations_lang_created
+        ON translations (target_lang COLLATE NOCASE, created_at, id)
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts
+        USING fts5(input, output, content='translations', content_rowid='id')
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS translations_fts_insert AFTER INSERT ON translations BEGIN
+            INSERT INTO translations_fts (rowid, input, output) VALUES (new.id, new.input, new.output);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS translations_fts_delete AFTER DELETE ON translations BEGIN
+            INSERT INTO translations_fts (translations_fts, rowid, input, output)
+            VALUES ('delete', old.id, old.input, old.output);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS translations_fts_update AFTER UPDATE OF input, output ON translations BEGIN
+            INSERT INTO translations_fts (translations_fts, rowid, input, output)
+            VALUES ('delete', old.id, old.input, old.output);
+            INSERT INTO translations_fts (rowid, input, output) VALUES (new.id, new.input, new.output);
+        END
+        """,
+        "INSERT INTO translations_fts (translations_fts) VALUES ('rebuild')",
+    ),
+)
+
+
+class ConnectionPool:
+    """
+    Small pool of long-lived SQLite connections shared by every session.
+
+    Streamlit runs each rerun on a fresh thread, so connections are pooled
+    rather than kept per thread. Each connection is only used by one thread
+    at a time.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._migrate()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _migrate(self):
+        conn = self._open()
+        try:
+            # Take the write lock first so concurrent processes migrate once
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for statements in MIGRATIONS[version:]:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening one if none is idle."""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and commit (or roll back) on exit."""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def get_pool(path=None):
+    """Process-wide pool for a database file, created (and migrated) once."""
+    return _pool(path or DB_NAME)
+
+
+@shared
+def _pool(path):
+    return ConnectionPool(path)
+
+
+def create_table():
+    # Schema creation happens once per process when the pool is first built
+    get_pool()
+
+def save_translation(user_input, translated_text, target_lang, cache_key=None):
+    save_translations([(user_input, translated_text, target_lang, cache_key)])
+
+@metrics.traced("translator_db_save")
+def save_translations(rows):
+    """
+    Insert many (input, output, target_lang[, cache_key]) rows in one
+    transaction. A row whose cache_key is already stored replaces its output.
+    """
+    now = time.time()
+    rows = [tuple(row) + (None,) * (4 - len(row)) + (now,) for row in rows]
+    with get_pool().transaction() as conn:
+        conn.executemany('''
+            INSERT INTO translations (input, output, target_lang, cache_key, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (cache_key) DO UPDATE SET output = excluded.output
+        ''', rows)
+
+@metrics.traced("translator_db_lookup")
+def lookup_translation(cache_key):
+    """Stored output for a cache key, or None."""
+    with get_pool().connection() as conn:
+        row = conn.execute(
+            'SELECT output FROM translations WHERE cache_key = ?', (cache_key,)
+        ).fetchone()
+    return row[0] if row else None
+
+@metrics.traced("translator_db_lookup_many")
+def lookup_translations(cache_keys):
+    """Stored outputs for many cache keys, as a {cache_key: output} dict."""
+    cache_keys = list(cache_keys)
+    found = {}
+    with get_pool().connection() as conn:
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(cache_keys), 500):
+            chunk = cache_keys[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(conn.execute(
+                f'SELECT cache_key, output FROM translations WHERE cache_key IN ({placeholders})', chunk
+            ).fetchall())
+    return found
+
+def _fts_query(search):
+    """Quote each word so user input is never parsed as FTS5 syntax; prefix-match it."""
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in search.split())
+
+@metrics.traced("translator_db_page")
+def get_translations_page(before=None, limit=PAGE_SIZE, target_lang=None, search=None):
+    """
+    One page of history, newest first, using keyset pagination.
+
+    Args:
+        before (tuple): Cursor returned with the previous page, or None for
+            the newest page.
+        limit (int): Rows per page.
+        target_lang (str): Only rows translated into this language
+            (case-insensitive).
+        search (str): Only rows whose input or output contain these words.
+
+    Returns:
+        tuple: (rows, next_cursor). Rows are (id, input, output, target_lang,
+            created_at); next_cursor is None on the last page.
+    """
+    clauses, params = [], []
+    source = "translations AS t"
+    if search and search.strip():
+        source += " JOIN translations_fts AS f ON f.rowid = t.id"
+        clauses.append("translations_fts MATCH ?")
+        params.append(_fts_query(search))
+    if target_lang and target_lang.strip():
+        clauses.append("t.target_lang = ? COLLATE NOCASE")
+        params.append(target_lang.strip())
+    if before is not None:
+        clauses.append("(t.created_at, t.id) < (?, ?)")
+        params.extend(before)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f'''
+        SELECT t.id, t.input, t.output, t.target_lang, t.created_at
+        FROM {source} {where}
+        ORDER BY t.created_at DESC, t.id DESC
+        LIMIT ?
+    '''
+    with get_pool().connection() as conn:
+        rows = conn.execute(sql, (*params, limit + 1)).fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][4], rows[-1][0])
+
+def iter_translations(page_size=PAGE_SIZE, target_lang=None, search=None):
+    """Yield history rows newest first, fetching one page at a time."""
+    cursor = None
+    while True:
+        rows, cursor = get_translations_page(cursor, page_size, target_lang, search)
+        yield from rows
+        if cursor is None:
+            return
 
+@metrics.traced("translator_db_all")
 def get_all_translations():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT * FROM translations')
-    data = c.fetchall()
-    conn.close()
-    return data
+    with get_pool().connection() as conn:
+        return conn.execute('SELECT * FROM translations').fetchall()
 
+@metrics.traced("translator_db_clear")
 def clear_translations():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('DELETE FROM translations')
-    conn.commit()
-    conn.close()
+    with get_pool().transaction() as conn:
+        conn.execute('DELETE FROM translations')
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import client as client_module
+from client import AsyncGeminiClient, GeminiClient
+
+
+class ScriptedGemini(BaseHTTPRequestHandler):
+    """
+    generateContent that echoes the prompt, after playing back `script`:
+    one (status, headers, delay) step per request until it runs out.
+    """
+
+    script = []
+    requests_seen = 0
+    in_flight = 0
+    peak_in_flight = 0
+    delay = 0.0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        cls = type(self)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with cls.lock:
+            cls.requests_seen += 1
+            step = cls.script.pop(0) if cls.script else (200, {}, cls.delay)
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        status, headers, delay = step
+        time.sleep(delay)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        text = "echo: " + body["contents"][0]["parts"][0]["text"]
+        payload = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode("utf-8")
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and hung up
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """A fresh stub per test, so handlers still sleeping from the last one cannot touch its counters."""
+    stub = type("Stub", (ScriptedGemini,), {"script": [], "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_port}/generate"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the client asked for, without waiting them out."""
+    recorded = []
+    # Only the client's view of `time`, so the stub server still really sleeps
+    monkeypatch.setattr(client_module, "time", SimpleNamespace(sleep=recorded.append))
+    return recorded
+
+
+def test_retries_429_and_5xx_honouring_retry_after(server, sleeps):
+    server.script = [(429, {"Retry-After": "7"}, 0), (503, {}, 0), (500, {"Retry-After": "2"}, 0)]
+    gemini = GeminiClient("test-key", api_url=server.url, max_retries=3, backoff=0.01)
+    try:
+        assert gemini.generate("hello") == "echo: hello"
+    finally:
+        gemini.close()
+    assert server.requests_seen == 4
+    assert sleeps[0] == 7 and sleeps[2] == 2
+    assert 0.005 <= sleeps[1] <= 0.02  # no Retry-After: jittered exponential backoff
+
+
+def test_retry_after_is_capped(server, sleeps):
+    server.script = [(429, {"Retry-After": "3600"}, 0)]
+    gemini = GeminiClient("test-key", api_url=server.url, max_retries=1)
+    try:
+        gemini.generate("hello")
+    finally:
+        gemini.close()
+    assert sleeps == [client_module.MAX_BACKOFF_SECONDS]
+
+
+def test_gives_up_after_max_retries(server, sleeps):
+    server.script = [(503, {}, 0)] * 3
+    gemini = GeminiClient("test-key", api_url=server.url, max_retries=2, backoff=0.01)
+    try:
+        with pytest.raises(requests.HTTPError):
+            gemini.generate("hello")
+    finally:
+        gemini.close()
+    assert server.requests_seen == 3
+    assert len(sleeps) == 2
+
+
+def test_read_timeout_is_retried(server, sleeps):
+    server.script = [(200, {}, 0.5)]
+    gemini = GeminiClient("test-key", api_url=server.url, read_timeout=0.1, max_retries=1, backoff=0.01)
+    try:
+        assert gemini.generate("hello") == "echo: hello"
+    finally:
+        gemini.close()
+    assert server.requests_seen == 2
+    assert len(sleeps) == 1
+
+
+def test_read_timeout_raises_when_out_of_retries(server, sleeps):
+    server.script = [(200, {}, 0.5)]
+    gemini = GeminiClient("test-key", api_url=server.url, read_timeout=0.1, max_retries=0)
+    try:
+        with pytest.raises(requests.Timeout):
+            gemini.generate("hello")
+    finally:
+        gemini.close()
+    assert sleeps == []
+
+
+def test_async_client_overlaps_requests_up_to_the_cap(server):
+    server.delay = 0.1
+    gemini = GeminiClient("test-key", api_url=server.url, max_retries=0)
+    prompts = [f"prompt {n}" for n in range(8)]
+    try:
+        started = time.perf_counter()
+        responses = asyncio.run(AsyncGeminiClient(gemini, max_in_flight=4).generate_many(prompts))
+        elapsed = time.perf_counter() - started
+    finally:
+        gemini.close()
+    assert responses == [f"echo: {prompt}" for prompt in prompts]
+    assert server.peak_in_flight == 4
+    assert elapsed < 0.1 * len(prompts) / 2  # two waves of four, not eight in a row
+
+
+def test_async_client_retries_inside_each_request(server, sleeps):
+    server.script = [(429, {"Retry-After": "0"}, 0), (502, {"Retry-After": "0"}, 0)]
+    gemini = GeminiClient("test-key", api_url=server.url, max_retries=2)
+    prompts = ["a", "b", "c"]
+    try:
+        responses = asyncio.run(AsyncGeminiClient(gemini, max_in_flight=3).generate_many(prompts))
+    finally:
+        gemini.close()
+    assert responses == ["echo: a", "echo: b", "echo: c"]
+    assert server.requests_seen == 5
@@ -0,0 +1,32 @@
+import sqlite3
+
+import memory
+from cache import TranslationCache
+
+
+def test_history_from_before_the_cache_is_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "memory.db")
+    conn = sqlite3.connect(path)
+    conn.execute(memory.MIGRATIONS[0][0])
+    conn.executemany(
+        "INSERT INTO translations (input, output, target_lang) VALUES (?, ?, ?)",
+        [("Good morning", "Bonjour", "French"), ("Thanks", "Danke", "German"),
+         ("Good morning ", "Bonjour !", "french")],
+    )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(memory, "DB_NAME", path)
+    cache = TranslationCache()
+    assert cache.get("Good morning", "French") == "Bonjour !"  # newest of the duplicates
+    assert cache.get("Thanks", "german") == "Danke"
+    assert cache.stats()["db_hits"] == 2
+    assert len(memory.get_all_translations()) == 3  # history itself is untouched
+
+
+def test_front_layer_budget_counts_encoded_bytes():
+    cache = TranslationCache(max_bytes=10)
+    cache.front.put("a", "ééééé")  # 5 characters, 10 bytes
+    cache.front.put("b", "é")
+    assert "a" not in cache.front and "b" in cache.front
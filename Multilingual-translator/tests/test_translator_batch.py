@@ -0,0 +1,103 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import memory
+from batch import MARKER_PATTERN, read_segments, translate_segments
+from cache import TranslationCache
+from client import GeminiClient
+
+
+# ---------- read_segments ----------
+def test_read_segments_jsonl_strings_and_objects():
+    data = '"hello"\n\n{"text": "good morning", "id": 2}\n{"text": "  "}\n'
+    assert read_segments("input.jsonl", data.encode("utf-8")) == ["hello", "good morning"]
+
+
+@pytest.mark.parametrize("record", ['42', '["hello"]', 'null', '{"id": 3}', '{"text": 5}', '{"text": ["a"]}'])
+def test_read_segments_rejects_other_jsonl_records(record):
+    with pytest.raises(ValueError, match="Line 2"):
+        read_segments("input.jsonl", f'"hello"\n{record}\n')
+
+
+def test_read_segments_reports_invalid_json_line():
+    with pytest.raises(ValueError, match="Line 3"):
+        read_segments("input.jsonl", '"a"\n"b"\n{broken\n')
+
+
+# ---------- translate_segments against a stub Gemini ----------
+class StubGemini(BaseHTTPRequestHandler):
+    """generateContent that answers every marker, except for segments containing "LOSE"."""
+
+    prompts = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["contents"][0]["parts"][0]["text"]
+        self.prompts.append(prompt)
+        parts = MARKER_PATTERN.split(prompt)
+        if len(parts) > 1:
+            text = "\n".join(
+                f"<<<{number}>>>\n[fr] {segment.strip()}"
+                for number, segment in zip(parts[1::2], parts[2::2])
+                if "LOSE" not in segment
+            )
+        else:
+            text = "[fr] " + prompt.rsplit("\n", 1)[-1]
+        payload = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini():
+    StubGemini.prompts = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = GeminiClient("test-key", api_url=f"http://127.0.0.1:{server.server_port}/generate", max_retries=0)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def translation_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory, "DB_NAME", str(tmp_path / "memory.db"))
+    return TranslationCache()
+
+
+def test_translate_segments_packs_requests_and_keeps_order(gemini, translation_cache):
+    segments = [f"sentence number {n}" for n in range(30)] + ["sentence number 3"]
+    progress = []
+
+    translated = translate_segments(
+        segments, "French", gemini, cache=translation_cache, max_chars=200,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert translated == [f"[fr] {text}" for text in segments]
+    assert 1 < len(StubGemini.prompts) < 30  # Packed, but split by max_chars
+    assert progress[0] == (0, 30) and progress[-1] == (30, 30)
+
+
+def test_translate_segments_uses_memory_and_retries_lost_markers(gemini, translation_cache):
+    translate_segments(["already known"], "French", gemini, cache=translation_cache)
+    StubGemini.prompts.clear()
+
+    translated = translate_segments(
+        ["already known", "LOSE this one", "and this"], "French", gemini, cache=translation_cache
+    )
+
+    assert translated == ["[fr] already known", "[fr] LOSE this one", "[fr] and this"]
+    # One packed request, plus a single retry for the segment whose marker was lost
+    assert len(StubGemini.prompts) == 2
+    assert all("already known" not in prompt for prompt in StubGemini.prompts)
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+
+APP_DIR = Path(__file__).resolve().parent
+DB_PATH = APP_DIR / "research_cache.db"
+
+SEARCH_TTL_SECONDS = 6 * 3600
+SUMMARY_TTL_SECONDS = 7 * 24 * 3600
+MAX_BYTES = 64 * 1024 * 1024
+FRONT_MAX_BYTES = 8 * 1024 * 1024
+
+# Hashed words and character trigrams: cheap, local and good at catching rephrasings
+VECTOR_DIM = 1024
+NGRAM = 3
+SIMILARITY_THRESHOLD = 0.9
+
+# Left out of similarity vectors so "effects of X" and "X effects" compare equal
+STOPWORDS = frozenset(
+    "a an and are at about by for from how in is of on or the to vs what why with".split()
+)
+
+
+def normalise_query(query):
+    """Case, accents-as-typed, punctuation and spacing ignored."""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", query).split())
+
+
+def token_set(query):
+    """Distinct normalised words in sorted order: "China tariffs on" == "tariffs on china"."""
+    return " ".join(sorted(set(normalise_query(query).split())))
+
+
+def _stem(word):
+    """Crude plural folding: "tariffs" -> "tariff", "policies" -> "policy"."""
+    if len(word) > 3 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def query_words(query):
+    """Stemmed content words of the normalised query, stopwords dropped."""
+    return [_stem(word) for word in normalise_query(query).split() if word not in STOPWORDS]
+
+
+def query_vector(query):
+    """L2-normalised bag of hashed content words and their character n-grams."""
+    features = []
+    for word in query_words(query):
+        padded = f" {word} "
+        features.append(f"w{word}")
+        features.extend(f"g{padded[i:i + NGRAM]}" for i in range(len(padded) - NGRAM + 1))
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    # crc32 rather than hash(), which is salted per process
+    for feature in features:
+        vector[zlib.crc32(feature.encode("utf-8")) % VECTOR_DIM] += 1.0
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+def _typed_words(query):
+    """Words as typed, keeping case and dotted numbers such as "3.11"."""
+    return re.findall(r"\w+(?:\.\w+)*", unicodedata.normalize("NFKC", query))
+
+
+def query_terms(query):
+    """Every stemmed, casefolded word of the query, for checking anchors against."""
+    return {_stem(word.casefold()) for word in _typed_words(query)}
+
+
+def query_anchors(query):
+    """
+    Terms a reused search must also contain: anything with a digit
+    ("3.11", "2024") and proper nouns or acronyms, i.e. words typed with a
+    capital that are not just the first word of the query.
+    """
+    anchors = set()
+    for position, word in enumerate(_typed_words(query)):
+        if any(ch.isdigit() for ch in word) or (word[0].isupper() and (position > 0 or word.isupper())):
+            anchors.add(_stem(word.casefold()))
+    return anchors
+
+
+def query_angle(query, topic=None):
+    """The normalised sub-query with the base topic taken off the front ("" for the topic itself)."""
+    text = normalise_query(query)
+    if topic is None:
+        return ""
+    base = normalise_query(topic)
+    return text[len(base):].strip() if text.startswith(base) else text
+
+
+def search_key(query, num_results):
+    return f"{num_results}\x1f{normalise_query(query)}"
+
+
+def summary_key(results, style, topic=""):
+    """Content address of a summary: the topic, the search results it was built from and the style."""
+    digest = hashlib.sha256(style.encode("utf-8"))
+    digest.update(b"\x1e" + token_set(topic).encode("utf-8"))
+    for result in results:
+        for field in ("url", "content"):
+            digest.update(b"\x1f" + str(result.get(field, "")).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResearchCache:
+    """
+    Two-level research cache persisted in SQLite.
+
+    Level one holds raw search results keyed by the normalised query and
+    `num_results` and expires after `search_ttl`. Level two holds final
+    summaries keyed by a hash of the search content and the style, so the
+    same sources for the same topic never reach the LLM twice. Each query
+    also stores a hashed n-gram vector of its topic, and with `fuzzy` a
+    search miss can fall back to the most similar cached query above
+    `similarity` (see `get_search`). An in-process LRU sits in front, and
+    the file is kept under `max_bytes` by evicting the least recently used
+    rows.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        search_ttl=SEARCH_TTL_SECONDS,
+        summary_ttl=SUMMARY_TTL_SECONDS,
+        max_bytes=MAX_BYTES,
+        similarity=SIMILARITY_THRESHOLD,
+    ):
+        self.search_ttl = search_ttl
+        self.summary_ttl = summary_ttl
+        self.max_bytes = max_bytes
+        self.similarity = similarity
+        self.front = LRUCache(max_bytes=FRONT_MAX_BYTES)
+        self.hits = {"search": 0, "similar": 0, "summary": 0}
+        self.misses = {"search": 0, "summary": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS searches (
+                    key TEXT PRIMARY KEY,
+                    num_results INTEGER,
+                    results TEXT,
+                    vector BLOB,
+                    angle TEXT,
+                    terms TEXT,
+                    anchors TEXT,
+                    expires_at REAL,
+                    last_used REAL,
+                    size INTEGER
+                )
+            ''')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT,
+                    expires_at REAL,
+                    last_used REAL,
+                    size INTEGER
+                )
+            ''')
+            self._db.execute("CREATE INDEX IF NOT EXISTS searches_by_angle ON searches (num_results, angle, expires_at)")
+
+    # ---------- Level one: search results ----------
+    def get_search(self, query, num_results, fuzzy=False, topic=None):
+        """
+        Cached search results, or None.
+
+        With `fuzzy`, a miss on the exact query is retried against live
+        queries with the same `num_results` and the same angle after the
+        base `topic`. The one whose topic is closest wins if its cosine
+        similarity reaches `similarity` and each query's numbers and proper
+        nouns also appear in the other, so "python 3.11" never answers for
+        "python 3.12" nor "tariffs on China" for "tariffs on Chile".
+        """
+        key = search_key(query, num_results)
+        cached = self._get("searches", "results", key)
+        if cached is not None:
+            self.hits["search"] += 1
+            return json.loads(cached)
+
+        if fuzzy and self.similarity is not None:
+            similar = self._most_similar(query, num_results, topic)
+            if similar is not None:
+                self.hits["similar"] += 1
+                return json.loads(similar)
+        self.misses["search"] += 1
+        return None
+
+    def put_search(self, query, num_results, results, topic=None):
+        key = search_key(query, num_results)
+        payload = json.dumps(results, ensure_ascii=False)
+        vector = query_vector(topic if topic is not None else query).tobytes()
+        terms = " ".join(sorted(query_terms(query)))
+        anchors = " ".join(sorted(query_anchors(query)))
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, num_results, payload, vector, query_angle(query, topic), terms, anchors,
+                 now + self.search_ttl, now, len(payload.encode("utf-8")) + len(vector)),
+            )
+            self._evict()
+        self.front.put(key, payload, ttl=self.search_ttl)
+
+    def _most_similar(self, query, num_results, topic):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, vector, terms, anchors FROM searches WHERE num_results = ? AND angle = ? AND expires_at > ?",
+                (num_results, query_angle(query, topic), time.time()),
+            ).fetchall()
+        terms, anchors = query_terms(query), query_anchors(query)
+        rows = [
+            row for row in rows
+            if anchors <= set(row[2].split()) and set(row[3].split()) <= terms
+        ]
+        if not rows:
+            return None
+        vectors = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        scores = vectors @ query_vector(topic if topic is not None else query)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        return self._get("searches", "results", rows[best][0])
+
+    # ---------- Level two: summaries ----------
+    def get_summary(self, results, style, topic=""):
+        key = summary_key(results, style, topic)
+        cached = self._get("summaries", "summary", key)
+        if cached is None:
+            self.misses["summary"] += 1
+            return None
+        self.hits["summary"] += 1
+        return cached
+
+    def put_summary(self, results, style, summary, topic=""):
+        key = summary_key(results, style, topic)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                (key, summary, now + self.summary_ttl, now, len(summary.encode("utf-8"))),
+            )
+            self._evict()
+        self.front.put(key, summary, ttl=self.summary_ttl)
+
+    # ---------- Storage ----------
+    def _get(self, table, column, key):
+        # Search keys and summary hashes cannot collide, so one front LRU serves both
+        cached = self.front.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock, self._db:
+            row = self._db.execute(
+                f"SELECT {column}, expires_at FROM {table} WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(f"UPDATE {table} SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.front.put(key, row[0], ttl=row[1] - time.time())
+        return row[0]
+
+    def _evict(self):
+        """Drop expired rows, then least recently used ones until under `max_bytes`. Caller holds the lock."""
+        now = time.time()
+        for table in ("searches", "summaries"):
+            self._db.execute(f"DELETE FROM {table} WHERE expires_at <= ?", (now,))
+        total = self._db.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM searches) + (SELECT COALESCE(SUM(size), 0) FROM summaries)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute('''
+            SELECT 'searches', key, size, last_used FROM searches
+            UNION ALL
+            SELECT 'summaries', key, size, last_used FROM summaries
+            ORDER BY last_used
+        ''')
+        for table, key, size, _ in rows.fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+    def kind_stats(self, kind):
+        """Hits, misses and hit rate for "search" (fuzzy hits included) or "summary"."""
+        hits = self.hits[kind] + (self.hits["similar"] if kind == "search" else 0)
+        lookups = hits + self.misses[kind]
+        return {"hits": hits, "misses": self.misses[kind], "hit_rate": hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM searches")
+            self._db.execute("DELETE FROM summaries")
+        self.front.clear()
+
+
+@shared
+def get_research_cache():
+    cache = ResearchCache()
+    metrics.watch_cache("research_search", lambda: cache.kind_stats("search"))
+    metrics.watch_cache("research_summary", lambda: cache.kind_stats("summary"))
+    return cache
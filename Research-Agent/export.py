@@ -0,0 +1,118 @@
+import hashlib
+import io
+import re
+import sys
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from html import escape
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+
+PDF_WORKERS = 2
+PDF_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def pdf_key(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def build_pdf(html):
+    """Render HTML to PDF bytes with xhtml2pdf (imported on first use)."""
+    from xhtml2pdf import pisa
+
+    pdf = io.BytesIO()
+    with metrics.span("research_pdf"):
+        status = pisa.CreatePDF(io.StringIO(html), dest=pdf)
+    if status.err:
+        raise RuntimeError("❌ PDF generation failed.")
+    return pdf.getvalue()
+
+
+def slugify(title, default="research_summary"):
+    slug = re.sub(r"[^\w-]+", "_", title.strip().casefold()).strip("_")
+    return slug[:60] or default
+
+
+class PdfExporter:
+    """
+    Background PDF builder with a bytes cache.
+
+    `submit` starts a build on a worker thread and returns at once, so the
+    page renders while the PDF is made. Builds are keyed by a hash of the
+    HTML: the same summary is only ever rendered once, and concurrent
+    requests for it share one build.
+    """
+
+    def __init__(self, workers=PDF_WORKERS, max_bytes=PDF_CACHE_BYTES):
+        self.cache = LRUCache(max_bytes=max_bytes)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-export")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, html):
+        """Future of the PDF bytes for `html`."""
+        key = pdf_key(html)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            pdf = self.cache.get(key)
+            if pdf is None:
+                future = self._inflight[key] = self._pool.submit(self._build, key, html)
+                return future
+        # Already built: hand back a finished future rather than a trip through the pool
+        future = Future()
+        future.set_result(pdf)
+        return future
+
+    def _build(self, key, html):
+        try:
+            pdf = build_pdf(html)
+            self.cache.put(key, pdf)
+            return pdf
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, html, timeout=None):
+        """PDF bytes for `html`, waiting for the build if needed."""
+        return self.submit(html).result(timeout)
+
+    def export_zip(self, summaries):
+        """
+        ZIP with a PDF and the Markdown source of every summary.
+
+        Args:
+            summaries (list): (title, markdown, html) tuples.
+        """
+        futures = [self.submit(html) for _, _, html in summaries]  # Built in parallel
+        archive = io.BytesIO()
+        used = set()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            for (title, markdown_text, _), future in zip(summaries, futures):
+                name = slugify(title)
+                while name in used:
+                    name += "_"
+                used.add(name)
+                zf.writestr(f"{name}.md", markdown_text)
+                zf.writestr(f"{name}.pdf", future.result())
+        return archive.getvalue()
+
+    def export_pdf(self, summaries):
+        """One PDF with every summary under its own heading, one per page."""
+        sections = [f"<h1>{escape(title)}</h1>\n{html}" for title, _, html in summaries]
+        return self.get("\n<pdf:nextpage />\n".join(sections))
+
+
+@shared
+def get_pdf_exporter():
+    exporter = PdfExporter()
+    metrics.watch_cache("research_pdf", exporter.cache.stats)
+    return exporter
@@ -0,0 +1,66 @@
+def format_bullets(text):
+    """Normalise a bullet summary to one `* point` per line."""
+    lines = [
+        f"* {line.strip()}"
+        for line in text.strip().replace("\n", "").split("* ")
+        if line.strip()
+    ]
+    return "\n".join(lines)
+
+
+class BulletFormatter:
+    """
+    Incremental `format_bullets` for streamed text.
+
+    Feed chunks as they arrive; each call returns the newly completed
+    lines, and `text` also includes the point still being written, for
+    display. The output once `finish()` is called equals
+    `format_bullets(full_text)`: a `* ` only ends a point once something
+    other than whitespace follows it, which matches how the batch version
+    strips the text before splitting.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._lines = []
+
+    def feed(self, chunk):
+        self._buffer += chunk.replace("\n", "")
+        completed = []
+        while True:
+            index = self._buffer.find("* ")
+            if index < 0 or not self._buffer[index + 2:].strip():
+                break
+            completed.extend(self._emit(self._buffer[:index]))
+            self._buffer = self._buffer[index + 2:]
+        return self._join(completed)
+
+    def finish(self):
+        """Flush the last point once the stream has ended."""
+        completed = []
+        for segment in self._buffer.rstrip().split("* "):
+            completed.extend(self._emit(segment))
+        self._buffer = ""
+        return self._join(completed)
+
+    @property
+    def text(self):
+        """Everything formatted so far, including the unfinished point."""
+        partial = self._buffer.strip()
+        if partial.endswith("*"):
+            partial = partial[:-1].rstrip()  # Probably the next separator
+        lines = self._lines + ([f"* {partial}"] if partial else [])
+        return "\n".join(lines)
+
+    def _emit(self, segment):
+        line = segment.strip()
+        if not line:
+            return []
+        self._lines.append(f"* {line}")
+        return [self._lines[-1]]
+
+    def _join(self, completed):
+        if not completed:
+            return ""
+        first = len(self._lines) == len(completed)
+        return ("" if first else "\n") + "\n".join(completed)
@@ -1,27 +1,57 @@
 import os
-import io
+import sys
+from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import markdown
-from xhtml2pdf import pisa
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cache import get_research_cache
+from common import metrics
+from common.shared import shared
+from export import get_pdf_exporter
+from formatting import BulletFormatter, format_bullets
+from passages import TOKEN_BUDGET
+from pipeline import (
+    EXTRA_ANGLES,
+    STYLE_INSTRUCTIONS,
+    SUB_QUERY_ANGLES,
+    langchain_llm,
+    langchain_stream,
+    planned_calls,
+    research,
+)
 
 # Load env vars from .env file
 load_dotenv()
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Setup Tavily Search Tool
-search_tool = TavilySearchResults(api_key=TAVILY_API_KEY)
+# Summaries kept in the session for batch export
+MAX_HISTORY = 20
 
-# Setup Gemini Chat Model
-llm = ChatGoogleGenerativeAI(
-    api_key=GEMINI_API_KEY,
-    model="gemini-1.5-flash-latest",
-    temperature=0.3
-)
+# How often the page checks whether a requested PDF is ready
+PDF_POLL_SECONDS = 1
+
+# Clients are built once per process, on the first research run, so
+# reruns and the first page load don't pay for importing LangChain
+@shared
+def get_search_tool(api_key):
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    return TavilySearchResults(api_key=api_key)
+
+
+@shared
+def get_llm(api_key):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        api_key=api_key,
+        model="gemini-1.5-flash-latest",
+        temperature=0.3
+    )
 
 # Streamlit page config
 st.set_page_config(
@@ -91,80 +121,157 @@ num_results = st.slider(
 
 summary_style = st.radio(
     "Choose your summary style:",
-    ["Short bullets", "Detailed paragraphs", "Q&A style"]
+    list(STYLE_INSTRUCTIONS)
 )
 
-if st.button("Run Research") and query:
-    with st.spinner("🔎 Searching..."):
+token_budget = st.slider(
+    "Context budget sent to the model (tokens):",
+    min_value=1000,
+    max_value=16000,
+    value=TOKEN_BUDGET,
+    step=500
+)
 
-        # Step 1 → Search Tavily
-        search_results = search_tool.run(query, num_results=num_results)
+stream_output = st.checkbox("Show the summary as it is written", value=True)
+reuse_similar = st.checkbox("Reuse earlier searches for closely worded topics", value=False)
 
-        # Combine results
-        combined_text = "\n\n".join(
-            [item['content'] for item in search_results]
-        )
+# Both options trade more API calls for broader coverage, so they start off
+search_angles = st.checkbox(
+    f"Also search for: {', '.join(EXTRA_ANGLES)} (one extra search each)", value=False
+)
+summarise_each = st.checkbox("Summarise each source before merging (one extra model call per source)", value=False)
+angles = SUB_QUERY_ANGLES + EXTRA_ANGLES if search_angles else SUB_QUERY_ANGLES
+searches, model_calls = planned_calls(num_results, angles, summarise_each)
+st.caption(f"ℹ️ An uncached run makes {searches} Tavily search(es) and about {model_calls} Gemini call(s).")
 
-        # Step 2 → Create prompt
-        if summary_style == "Short bullets":
-            style_instruction = (
-                "Summarize the following into clear bullet points. "
-                "Start each point on a new line with '* '."
-            )
-        elif summary_style == "Detailed paragraphs":
-            style_instruction = (
-                "Write a detailed research summary in paragraphs, using Markdown formatting."
-            )
-        else:
-            style_instruction = (
-                "Present the following research as a Q&A summary in Markdown format."
-            )
 
-        prompt_template = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    f"You are an expert research assistant. {style_instruction}"
-                ),
-                ("human", "{input_text}"),
-            ]
-        )
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def wait_for_pdf(future):
+    """Poll a PDF build without rerunning the page; rerun it once the PDF is ready."""
+    if future.done():
+        st.rerun()
+    st.caption("⏳ Building the PDF...")
+
+
+if st.button("Run Research") and query:
+    st.markdown("## 📄 Research Summary")
+    summary_box = st.empty()
+
+    # Tokens are rendered as they arrive; bullets are normalised on the fly
+    formatter = BulletFormatter() if summary_style == "Short bullets" else None
+    streamed = []
 
-        formatted_prompt = prompt_template.format(input_text=combined_text)
+    def show_token(chunk):
+        if formatter:
+            formatter.feed(chunk)
+            summary_box.markdown(formatter.text)
+        else:
+            streamed.append(chunk)
+            summary_box.markdown("".join(streamed))
 
-        # Step 3 → Call Gemini
-        summary = llm.invoke(formatted_prompt)
+    with st.spinner("🔎 Searching..."):
+        search_tool = get_search_tool(TAVILY_API_KEY)
+        llm = get_llm(GEMINI_API_KEY)
+
+        # Sub-queries are searched concurrently, each result is summarised
+        # in parallel and the notes are merged into the chosen style
+        with metrics.span("research_request", style=summary_style, num_results=num_results):
+            result = research(
+                query,
+                search=search_tool.run,
+                llm=langchain_llm(llm),
+                stream=langchain_stream(llm),
+                style=summary_style,
+                num_results=num_results,
+                on_token=show_token if stream_output else None,
+                cache=get_research_cache(),
+                fuzzy_cache=reuse_similar,
+                angles=angles,
+                summarise_each=summarise_each,
+                token_budget=token_budget,
+            )
 
         # Clean up bullet formatting if required
-        final_output = summary.content.strip()
+        final_output = result.summary
 
         if summary_style == "Short bullets":
-            # Ensure consistent bullet formatting
-            lines = [
-                f"* {line.strip()}"
-                for line in final_output.replace("\n", "").split("* ")
-                if line.strip()
-            ]
-            final_output = "\n".join(lines)
+            # Same result the streaming formatter converged on
+            final_output = format_bullets(final_output)
+
+        # Converted once; reused for display and the PDF
+        import markdown
+
+        with metrics.span("research_markdown"):
+            html_content = markdown.markdown(final_output)
 
         # Step 4 → Display
-        st.markdown("## 📄 Research Summary")
-        st.markdown(
-            f"<div class='fade-in'>{markdown.markdown(final_output)}</div>",
+        summary_box.markdown(
+            f"<div class='fade-in'>{html_content}</div>",
             unsafe_allow_html=True
         )
 
-        # Step 5 → Generate PDF
-        html_content = markdown.markdown(final_output)
+        if result.cached:
+            st.caption("⚡ Summary served from cache")
+        if result.context:
+            st.caption(
+                f"🧹 Context: {result.context.original_tokens:,} → {result.context.packed_tokens:,} tokens "
+                f"(saved {result.context.tokens_saved:,}; {result.context.duplicates} duplicate passages removed)"
+            )
 
-        pdf_bytes = io.BytesIO()
-        pisa.CreatePDF(io.StringIO(html_content), dest=pdf_bytes)
-        pdf_bytes.seek(0)
+        if result.sources:
+            with st.expander(f"🔗 Sources ({len(result.sources)})"):
+                for title, url in result.sources:
+                    st.markdown(f"- [{title}]({url})")
 
-        # Download button
-        st.download_button(
-            label="⬇️ Download Summary as PDF",
-            data=pdf_bytes,
-            file_name="research_summary.pdf",
-            mime="application/pdf"
-        )
+        history = st.session_state.setdefault("summaries", [])
+        history[:] = [entry for entry in history if entry[2] != html_content][-(MAX_HISTORY - 1):]
+        history.append((f"{query} ({summary_style})", final_output, html_content))
+        st.session_state.pop("pdf_future", None)  # Belongs to the previous summary
+
+elif st.session_state.get("summaries"):
+    # Keep the latest summary on screen when the page reruns, e.g. for the PDF
+    latest_title, _, latest_html = st.session_state["summaries"][-1]
+    st.markdown("## 📄 Research Summary")
+    st.caption(latest_title)
+    st.markdown(latest_html, unsafe_allow_html=True)
+
+# ------------------ PDF ------------------
+# Built only when asked for, in the background; the download button
+# appears once the bytes are ready instead of blocking every run
+if st.session_state.get("summaries"):
+    latest_html = st.session_state["summaries"][-1][2]
+    if st.button("📄 Prepare PDF"):
+        st.session_state["pdf_future"] = get_pdf_exporter().submit(latest_html)
+
+    pdf_future = st.session_state.get("pdf_future")
+    if pdf_future is not None and not pdf_future.done():
+        wait_for_pdf(pdf_future)
+    elif pdf_future is not None:
+        try:
+            st.download_button(
+                label="⬇️ Download Summary as PDF",
+                data=pdf_future.result(),
+                file_name="research_summary.pdf",
+                mime="application/pdf"
+            )
+        except Exception as e:
+            st.error(f"⚠️ Could not build the PDF: {e}")
+
+# ------------------ Batch Export ------------------
+if st.session_state.get("summaries"):
+    with st.expander("📦 Export several summaries"):
+        titles = [title for title, _, _ in st.session_state["summaries"]]
+        chosen = st.multiselect("Summaries to export:", titles, default=titles)
+        export_format = st.radio("Export as:", ["ZIP of PDFs", "Single PDF"], horizontal=True)
+
+        if st.button("Build export") and chosen:
+            selected = [entry for entry in st.session_state["summaries"] if entry[0] in chosen]
+            with st.spinner("📦 Building export..."):
+                try:
+                    if export_format == "ZIP of PDFs":
+                        data, file_name, mime = get_pdf_exporter().export_zip(selected), "research_summaries.zip", "application/zip"
+                    else:
+                        data, file_name, mime = get_pdf_exporter().export_pdf(selected), "research_summaries.pdf", "application/pdf"
+                    st.download_button(label="⬇️ Download Export", data=data, file_name=file_name, mime=mime)
+                except Exception as e:
+                    st.error(f"⚠️ Could not build the export: {e}")
@@ -0,0 +1,179 @@
+"""
+Context preparation for search results.
+
+Results are split into passages, near-duplicate passages (boilerplate,
+syndicated copies of the same article) are dropped with MinHash, the rest
+are ranked against the query with BM25 and packed greedily into a token
+budget. Only what survives is sent to the LLM.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter, namedtuple
+
+import numpy as np
+
+TOKEN_BUDGET = 6000
+PASSAGE_WORDS = 120
+MIN_PASSAGE_WORDS = 8
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+LSH_BANDS = 16
+DUPLICATE_THRESHOLD = 0.8
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_HASH_PRIME = 4294967311  # Smallest prime above 2**32
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+Passage = namedtuple("Passage", ["source", "position", "text", "tokens"])
+ContextReport = namedtuple(
+    "ContextReport", ["original_tokens", "packed_tokens", "tokens_saved", "passages", "duplicates", "over_budget"]
+)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)."""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def words(text):
+    return _WORD.findall(text.casefold())
+
+
+def split_passages(results, max_words=PASSAGE_WORDS, min_words=MIN_PASSAGE_WORDS):
+    """
+    Split every result's content into passages of about `max_words` words.
+
+    Short lines are merged with their neighbours and long paragraphs are cut
+    at sentence ends. Fragments under `min_words` (menus, bylines) are
+    dropped when the same result has longer passages; a result made only of
+    short text, like a one-line snippet, is kept as it is.
+    """
+    passages = []
+    for source, result in enumerate(results):
+        sentences = []
+        for line in (result.get("content") or "").splitlines():
+            sentences.extend(part for part in re.split(r"(?<=[.!?])\s+", line.strip()) if part)
+
+        chunks, current, count = [], [], 0
+        for sentence in sentences + [None]:
+            size = len(sentence.split()) if sentence else 0
+            if current and (sentence is None or count + size > max_words):
+                chunks.append((" ".join(current), count))
+                current, count = [], 0
+            if sentence:
+                current.append(sentence)
+                count += size
+
+        kept = [text for text, count in chunks if count >= min_words] or [text for text, _ in chunks]
+        for text in kept:
+            passages.append(Passage(source, len(passages), text, estimate_tokens(text)))
+    return passages
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_words=SHINGLE_WORDS):
+    """MinHash signature (num_perm uint64 values) of each text's word shingles."""
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for row, text in enumerate(texts):
+        tokens = words(text)
+        shingles = {
+            " ".join(tokens[i:i + shingle_words]) for i in range(max(len(tokens) - shingle_words + 1, 1))
+        }
+        hashes = np.array([zlib.crc32(shingle.encode("utf-8")) for shingle in shingles], dtype=np.uint64)
+        # (a * x + b) mod p stays below 2**64 because a, x, b < 2**32
+        permuted = (np.outer(hashes, _PERM_A[:num_perm]) + _PERM_B[:num_perm]) % np.uint64(_HASH_PRIME)
+        signatures[row] = permuted.min(axis=0)
+    return signatures
+
+
+def near_duplicates(texts, threshold=DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+    """
+    Indices of texts that nearly duplicate an earlier one.
+
+    Candidates come from LSH banding of the MinHash signatures and are kept
+    only when their estimated Jaccard similarity reaches `threshold`, so
+    the first (most relevant) copy survives.
+    """
+    if len(texts) < 2:
+        return set()
+    signatures = minhash_signatures(texts)
+    rows = signatures.shape[1] // bands
+    duplicates = set()
+    buckets = {}
+    for index, signature in enumerate(signatures):
+        keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+        candidates = {other for key in keys for other in buckets.get(key, ())}
+        if any(np.mean(signatures[other] == signature) >= threshold for other in candidates):
+            duplicates.add(index)
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(index)
+    return duplicates
+
+
+def bm25_scores(query, texts, k1=BM25_K1, b=BM25_B):
+    """Okapi BM25 score of each text for the query, with IDF over these texts."""
+    documents = [Counter(words(text)) for text in texts]
+    if not documents:
+        return np.zeros(0)
+    lengths = np.array([sum(document.values()) for document in documents], dtype=np.float64)
+    average = lengths.mean() or 1.0
+    scores = np.zeros(len(documents))
+    for term in set(words(query)):
+        frequencies = np.array([document.get(term, 0) for document in documents], dtype=np.float64)
+        containing = np.count_nonzero(frequencies)
+        if not containing:
+            continue
+        idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+        scores += idf * frequencies * (k1 + 1) / (frequencies + k1 * (1 - b + b * lengths / average))
+    return scores
+
+
+def prepare_context(results, query, token_budget=TOKEN_BUDGET):
+    """
+    Deduplicate, rank and pack search results into a token budget.
+
+    Args:
+        results (list): Search result dicts with `content`.
+        query (str): What the passages are ranked against.
+        token_budget (int): Upper bound on the tokens of kept content.
+
+    Returns:
+        tuple: (results, ContextReport). Each returned result keeps its
+            url/title and has only its packed passages, in reading order;
+            results with nothing left are dropped.
+    """
+    passages = split_passages(results)
+    original = sum(estimate_tokens(result.get("content") or "") for result in results)
+
+    # Rank first, so deduplication keeps the most relevant copy
+    order = np.argsort(-bm25_scores(query, [passage.text for passage in passages]), kind="stable")
+    ranked = [passages[index] for index in order]
+    duplicates = near_duplicates([passage.text for passage in ranked])
+
+    packed, used, over_budget = [], 0, 0
+    for index, passage in enumerate(ranked):
+        if index in duplicates:
+            continue
+        if used + passage.tokens > token_budget:
+            over_budget += 1
+            continue  # A shorter passage further down may still fit
+        packed.append(passage)
+        used += passage.tokens
+
+    by_source = {}
+    for passage in sorted(packed, key=lambda passage: passage.position):
+        by_source.setdefault(passage.source, []).append(passage.text)
+    trimmed = [
+        {**results[source], "content": "\n\n".join(texts)}
+        for source, texts in sorted(by_source.items())
+    ]
+
+    report = ContextReport(original, used, max(original - used, 0), len(packed), len(duplicates), over_budget)
+    return trimmed, report
@@ -0,0 +1,334 @@
+import asyncio
+import inspect
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from passages import TOKEN_BUDGET, prepare_context
+
+STYLE_INSTRUCTIONS = {
+    "Short bullets": (
+        "Summarize the following into clear bullet points. "
+        "Start each point on a new line with '* '."
+    ),
+    "Detailed paragraphs": (
+        "Write a detailed research summary in paragraphs, using Markdown formatting."
+    ),
+    "Q&A style": (
+        "Present the following research as a Q&A summary in Markdown format."
+    ),
+}
+
+SYSTEM_PROMPT = "You are an expert research assistant."
+MAP_INSTRUCTION = (
+    "Extract the key facts from this search result that are relevant to the "
+    "research topic \"{topic}\". Reply with concise notes only."
+)
+COLLAPSE_INSTRUCTION = (
+    "Merge these research notes on \"{topic}\" into one set of concise notes, "
+    "keeping every distinct fact and dropping repetition."
+)
+
+# Each angle becomes its own search, so different facets are fetched in
+# parallel. Only the plain topic is searched unless extra angles are asked for,
+# since every angle is another search and, with `summarise_each`, another
+# `num_results` model calls.
+SUB_QUERY_ANGLES = ("",)
+EXTRA_ANGLES = ("latest developments", "challenges and limitations")
+MAX_CONCURRENCY = 4
+MAX_RESULT_CHARS = 8000
+MAX_REDUCE_CHARS = 24000
+
+_DONE = object()
+
+ResearchResult = namedtuple(
+    "ResearchResult",
+    ["summary", "sources", "sub_queries", "timings", "cached", "context"],
+    defaults=(False, None),
+)
+
+
+def sub_queries(topic, angles=SUB_QUERY_ANGLES):
+    """Break a topic into focused search queries, the plain topic first."""
+    topic = " ".join(topic.split())
+    return list(dict.fromkeys(f"{topic} {angle}".strip() for angle in angles))
+
+
+def planned_calls(num_results, angles=SUB_QUERY_ANGLES, summarise_each=False):
+    """
+    (searches, model calls) one uncached run makes, to show before it starts.
+
+    Collapse rounds for very long material are not counted.
+    """
+    searches = len(set(angles))
+    return searches, (searches * num_results if summarise_each else 0) + 1
+
+
+def build_messages(instruction, text):
+    """Chat messages: the assistant's role and task as the system message, the material as the human one."""
+    return [("system", f"{SYSTEM_PROMPT} {instruction}"), ("human", text)]
+
+
+async def _call(fn, *args, **kwargs):
+    """Await async callables; run blocking ones in a worker thread."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _chunks(stream, messages):
+    """Iterate a sync or async token stream without blocking the event loop."""
+    chunks = stream(messages)
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+        return
+    chunks = iter(chunks)
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, _DONE)
+        if chunk is _DONE:
+            return
+        yield chunk
+
+
+def langchain_llm(llm):
+    """Adapt a LangChain chat model to the pipeline's `messages -> text` interface."""
+    async def generate(messages):
+        response = await llm.ainvoke(messages)
+        return response.content
+    return generate
+
+
+def langchain_stream(llm):
+    """Adapt a LangChain chat model's token stream to `messages -> chunks of text`."""
+    async def stream(messages):
+        async for chunk in llm.astream(messages):
+            if isinstance(chunk.content, str):
+                yield chunk.content
+    return stream
+
+
+class ResearchPipeline:
+    """
+    Fan-out research pipeline.
+
+    The topic is split into sub-queries (one per angle) that are searched
+    concurrently. The results are cut into passages, deduplicated, ranked
+    and packed into `token_budget` (see passages.py), then written up in
+    the requested style (reduce). With `summarise_each`, every remaining
+    source is first summarised in parallel (map) and only the notes are
+    merged. Text too long for one prompt is first collapsed in groups, so
+    long result sets never overflow the context. Each result is also capped
+    at `max_result_chars`.
+
+    By default a run is one search and one model call. Each extra angle adds
+    a search, and `summarise_each` adds one model call per result.
+
+    `search(query, num_results=...)` returns a list of result dicts with
+    `content` (and ideally `url`/`title`), and `llm(messages)` takes
+    `(role, text)` pairs (see `build_messages`) and returns text. Either
+    may be sync or async, so fakes can be swapped in to benchmark
+    the pipeline offline. The optional `stream(messages)` yields text chunks
+    (sync or async) and is used for the final answer when the caller asks
+    for tokens as they arrive. With a `cache` (see cache.ResearchCache),
+    repeated searches and summaries of the same sources for the same topic
+    skip the network entirely; `fuzzy_cache` also reuses searches for
+    closely worded topics (see cache.ResearchCache.get_search).
+    """
+
+    def __init__(
+        self,
+        search,
+        llm,
+        max_concurrency=MAX_CONCURRENCY,
+        max_result_chars=MAX_RESULT_CHARS,
+        max_reduce_chars=MAX_REDUCE_CHARS,
+        angles=SUB_QUERY_ANGLES,
+        summarise_each=False,
+        stream=None,
+        cache=None,
+        fuzzy_cache=False,
+        token_budget=TOKEN_BUDGET,
+    ):
+        self.search = search
+        self.llm = llm
+        self.stream = stream
+        self.cache = cache
+        self.fuzzy_cache = fuzzy_cache
+        self.token_budget = token_budget
+        self.max_concurrency = max_concurrency
+        self.max_result_chars = max_result_chars
+        self.max_reduce_chars = max_reduce_chars
+        self.angles = angles
+        self.summarise_each = summarise_each
+
+    async def run(self, topic, style="Short bullets", num_results=3, on_token=None):
+        """
+        Research a topic end to end.
+
+        Args:
+            topic (str): What to research.
+            style (str): A key of STYLE_INSTRUCTIONS.
+            num_results (int): Search results fetched per sub-query.
+            on_token (callable): Called with each chunk of the final answer
+                as it is generated; the summary is still returned whole.
+
+        Returns:
+            ResearchResult: Final summary, sources used, the sub-queries,
+                per-stage timings in seconds, whether the summary came from
+                the cache and the ContextReport of the packing stage.
+        """
+        # Created per run so the semaphore belongs to the running event loop
+        slots = asyncio.Semaphore(self.max_concurrency)
+        timings = {}
+
+        started = time.perf_counter()
+        queries = sub_queries(topic, self.angles)
+        results = await self._search_all(topic, queries, num_results)
+        timings["search"] = time.perf_counter() - started
+
+        context = None
+        if self.token_budget:
+            started = time.perf_counter()
+            results, context = prepare_context(results, topic, self.token_budget)
+            timings["prepare"] = time.perf_counter() - started
+            metrics.count("research_context_tokens_saved_total", context.tokens_saved)
+        sources = [(result.get("title") or result.get("url", ""), result.get("url", "")) for result in results]
+
+        if self.cache is not None:
+            summary = self.cache.get_summary(results, style, topic)
+            if summary is not None:
+                if on_token is not None:
+                    on_token(summary)
+                return ResearchResult(summary, sources, queries, timings, cached=True, context=context)
+
+        if self.summarise_each:
+            started = time.perf_counter()
+            notes = await asyncio.gather(*(self._summarise(topic, result, slots) for result in results))
+            timings["map"] = time.perf_counter() - started
+        else:
+            notes = [(result.get("content") or "")[:self.max_result_chars] for result in results]
+        notes = [note.strip() for note in notes if note and note.strip()]
+
+        started = time.perf_counter()
+        summary = await self._reduce(topic, notes, style, slots, on_token)
+        timings["reduce"] = time.perf_counter() - started
+
+        summary = summary.strip()
+        for stage, seconds in timings.items():
+            metrics.observe("research_stage_seconds", seconds, stage=stage)
+        if self.cache is not None and summary:
+            self.cache.put_summary(results, style, summary, topic)
+        return ResearchResult(summary, sources, queries, timings, context=context)
+
+    async def _search_all(self, topic, queries, num_results):
+        responses = await asyncio.gather(
+            *(self._search(topic, query, num_results) for query in queries),
+            return_exceptions=True,
+        )
+        failures = [response for response in responses if isinstance(response, BaseException)]
+        if len(failures) == len(responses):
+            raise failures[0]
+
+        # Interleave so every sub-query is represented, and drop repeated pages
+        results, seen = [], set()
+        # Tavily reports some errors as a string instead of raising
+        lists = [response for response in responses if isinstance(response, list)]
+        for rank in range(max(map(len, lists), default=0)):
+            for response in lists:
+                if rank >= len(response) or not isinstance(response[rank], dict):
+                    continue
+                result = response[rank]
+                key = result.get("url") or result.get("content")
+                if key and key not in seen:
+                    seen.add(key)
+                    results.append(result)
+        return results
+
+    async def _search(self, topic, query, num_results):
+        if self.cache is None:
+            return await self._remote_search(query, num_results)
+        results = self.cache.get_search(query, num_results, fuzzy=self.fuzzy_cache, topic=topic)
+        if results is None:
+            results = await self._remote_search(query, num_results)
+            if isinstance(results, list):
+                self.cache.put_search(query, num_results, results, topic=topic)
+        return results
+
+    async def _remote_search(self, query, num_results):
+        with metrics.span("research_search"):
+            results = await _call(self.search, query, num_results=num_results)
+        metrics.count("research_search_results_total", len(results) if isinstance(results, list) else 0)
+        return results
+
+    async def _generate(self, messages, slots):
+        async with slots:
+            with metrics.span("research_llm"):
+                return await _call(self.llm, messages)
+
+    async def _summarise(self, topic, result, slots):
+        content = (result.get("content") or "")[:self.max_result_chars]
+        if not content.strip():
+            return ""
+        instruction = MAP_INSTRUCTION.format(topic=topic)
+        return await self._generate(build_messages(instruction, content), slots)
+
+    async def _reduce(self, topic, notes, style, slots, on_token=None):
+        if not notes:
+            return ""
+        # Collapse groups of notes until everything fits in one prompt
+        while len(notes) > 1 and sum(map(len, notes)) > self.max_reduce_chars:
+            groups = self._group(notes)
+            if len(groups) == len(notes):
+                break  # Every note already needs a prompt of its own
+            instruction = COLLAPSE_INSTRUCTION.format(topic=topic)
+            notes = await asyncio.gather(
+                *(self._generate(build_messages(instruction, "\n\n".join(group)), slots) for group in groups)
+            )
+        text = "\n\n".join(notes)[:self.max_reduce_chars]
+        messages = build_messages(STYLE_INSTRUCTIONS[style], text)
+        if on_token is None or self.stream is None:
+            return await self._generate(messages, slots)
+        return await self._generate_streaming(messages, slots, on_token)
+
+    async def _generate_streaming(self, messages, slots, on_token):
+        parts = []
+        try:
+            async with slots:
+                with metrics.span("research_llm_stream"):
+                    started = time.perf_counter()
+                    async for chunk in _chunks(self.stream, messages):
+                        if chunk:
+                            if not parts:
+                                metrics.observe("research_llm_first_token_seconds", time.perf_counter() - started)
+                            parts.append(chunk)
+                            on_token(chunk)
+        except Exception:
+            if parts:
+                raise
+            # Streaming unavailable; fall back to one blocking call
+            text = await self._generate(messages, slots)
+            on_token(text)
+            return text
+        return "".join(parts)
+
+    def _group(self, notes):
+        groups, current, size = [], [], 0
+        for note in notes:
+            if current and size + len(note) > self.max_reduce_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append(note)
+            size += len(note)
+        groups.append(current)
+        return groups
+
+
+def research(topic, search, llm, style="Short bullets", num_results=3, on_token=None, **options):
+    """Blocking entry point for Streamlit scripts; `on_token` runs on the calling thread."""
+    return asyncio.run(ResearchPipeline(search, llm, **options).run(topic, style, num_results, on_token))
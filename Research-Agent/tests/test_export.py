@@ -0,0 +1,16 @@
+import export
+from export import PdfExporter
+
+
+def test_cached_pdf_comes_back_as_a_finished_future(monkeypatch):
+    builds = []
+    monkeypatch.setattr(export, "build_pdf", lambda html: builds.append(html) or b"%PDF " + html.encode())
+    exporter = PdfExporter(workers=1)
+    assert exporter.get("<p>hi</p>", timeout=5) == b"%PDF <p>hi</p>"
+
+    # A cache hit must not need the pool at all
+    exporter._pool.shutdown()
+    future = exporter.submit("<p>hi</p>")
+    assert future.done()
+    assert future.result() == b"%PDF <p>hi</p>"
+    assert builds == ["<p>hi</p>"]
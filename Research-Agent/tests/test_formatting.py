@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from formatting import BulletFormatter, format_bullets
+
+PIECES = ("* ", "*", " ", "  ", "\n", "\n\n", "**bold**", "word", "2 * 3", "-", "end.", "*\n ", " *")
+
+
+def random_text(rng):
+    return "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+
+
+def random_chunks(rng, text):
+    """Split `text` at random points, including empty and one-character chunks."""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, len(text) + 1)))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def stream(chunks):
+    formatter = BulletFormatter()
+    emitted = [formatter.feed(chunk) for chunk in chunks]
+    emitted.append(formatter.finish())
+    return formatter, "".join(emitted)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_streamed_output_equals_batch_output(seed):
+    rng = random.Random(seed)
+    text = random_text(rng)
+    expected = format_bullets(text)
+
+    for _ in range(5):
+        formatter, emitted = stream(random_chunks(rng, text))
+        assert emitted == expected
+        assert formatter.text == expected
+
+
+def test_one_character_chunks_of_a_summary():
+    text = "* First point\n* Second point with 2 * 3 inside\n\n*   Third  point \n"
+
+    formatter, emitted = stream(list(text))
+
+    assert emitted == format_bullets(text) == formatter.text
+
+
+def test_partial_text_never_shows_a_dangling_separator():
+    formatter = BulletFormatter()
+    formatter.feed("* First point *")
+    assert formatter.text == "* First point"
+    formatter.feed(" second")
+    assert formatter.text == "* First point\n* second"
@@ -0,0 +1,34 @@
+from passages import prepare_context, split_passages
+from pipeline import research
+
+SNIPPETS = [
+    {"url": "a", "content": "Python 3.13 removes the GIL optionally."},
+    {"url": "b", "content": "Free-threaded builds are experimental."},
+]
+
+
+def test_short_results_are_kept_whole():
+    passages = split_passages(SNIPPETS)
+    assert [passage.text for passage in passages] == [result["content"] for result in SNIPPETS]
+
+
+def test_short_fragments_are_dropped_next_to_longer_passages():
+    article = " ".join(["The interpreter lock limits parallel threads."] * 20)  # 120 words
+    passages = split_passages([{"content": article + "\nShare this"}], max_words=120)
+    assert [passage.text for passage in passages] == [article]
+
+
+def test_all_short_results_still_reach_the_model():
+    results, report = prepare_context(SNIPPETS, "python gil")
+    assert [result["url"] for result in results] == ["a", "b"]
+    assert report.tokens_saved == 0
+
+    prompts = []
+
+    def llm(messages):
+        prompts.append(messages)
+        return "* The GIL is optional in 3.13"
+
+    summary = research("python gil", search=lambda query, num_results: SNIPPETS, llm=llm).summary
+    assert summary == "* The GIL is optional in 3.13"
+    assert "removes the GIL" in prompts[-1][-1][1]
@@ -0,0 +1,78 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# The translator also has a top-level `cache` module, so load this app's by path
+_spec = importlib.util.spec_from_file_location(
+    "research_cache", Path(__file__).resolve().parent.parent / "cache.py"
+)
+research_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(research_cache)
+ResearchCache, query_anchors = research_cache.ResearchCache, research_cache.query_anchors
+
+RESULTS = [{"url": "a", "content": "cached"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResearchCache(db_path=tmp_path / "research_cache.db")
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("effects of climate change on agriculture", "climate change effects on agriculture"),
+    ("tariffs on China", "tariff on china"),
+    ("impact of AI on jobs", "AI impact on jobs"),
+    ("covid vaccines", "covid vaccine"),
+])
+def test_rephrased_topic_reuses_search(cache, stored, asked):
+    cache.put_search(stored, 5, RESULTS, topic=stored)
+    assert cache.get_search(asked, 5, fuzzy=True, topic=asked) == RESULTS
+    assert cache.hits["similar"] == 1
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("tariffs on China", "tariffs on Chile"),
+    ("python 3.11 release notes", "python 3.12 release notes"),
+    ("causes of inflation", "causes of deflation"),
+    ("renewable energy in germany", "renewable energy in germany and france"),
+])
+def test_different_topic_misses(cache, stored, asked):
+    cache.put_search(stored, 5, RESULTS, topic=stored)
+    assert cache.get_search(asked, 5, fuzzy=True, topic=asked) is None
+
+
+def test_proper_nouns_must_match_even_above_threshold(tmp_path):
+    cache = ResearchCache(db_path=tmp_path / "research_cache.db", similarity=0.5)
+    cache.put_search("history of Rome", 5, RESULTS, topic="history of Rome")
+    assert cache.get_search("history of Roma", 5, fuzzy=True, topic="history of Roma") is None
+    assert cache.get_search("Rome history", 5, fuzzy=True, topic="Rome history") == RESULTS
+
+
+def test_threshold_is_tunable(tmp_path):
+    strict = ResearchCache(db_path=tmp_path / "strict.db", similarity=1.01)
+    strict.put_search("effects of climate change", 5, RESULTS, topic="effects of climate change")
+    assert strict.get_search("climate change effects", 5, fuzzy=True, topic="climate change effects") is None
+
+    off = ResearchCache(db_path=tmp_path / "off.db", similarity=None)
+    off.put_search("covid vaccines", 5, RESULTS)
+    assert off.get_search("covid vaccine", 5, fuzzy=True) is None
+
+
+def test_fuzzy_is_off_by_default_and_needs_same_angle_and_size(cache):
+    cache.put_search("covid vaccines history", 5, RESULTS, topic="covid vaccines")
+    assert cache.get_search("covid vaccine history", 5, topic="covid vaccine") is None
+    assert cache.get_search("covid vaccine history", 10, fuzzy=True, topic="covid vaccine") is None
+    assert cache.get_search("covid vaccine latest news", 5, fuzzy=True, topic="covid vaccine") is None
+    assert cache.get_search("covid vaccine history", 5, fuzzy=True, topic="covid vaccine") == RESULTS
+
+
+def test_anchors_are_numbers_and_capitalised_words():
+    assert query_anchors("Tariffs on China since 2018 under the WTO") == {"china", "2018", "wto"}
+    assert query_anchors("python 3.11 speedups") == {"3.11"}
+
+
+def test_summaries_are_keyed_by_topic(cache):
+    cache.put_summary(RESULTS, "bullets", "summary", topic="covid vaccines")
+    assert cache.get_summary(RESULTS, "bullets", topic="vaccines covid") == "summary"
+    assert cache.get_summary(RESULTS, "bullets", topic="flu vaccines") is None
@@ -1,14 +1,16 @@
 import streamlit as st
-import requests
-from langdetect import detect
-from langcodes import Language
-from geopy.geocoders import Nominatim
-from streamlit_webrtc import webrtc_streamer, WebRtcMode, AudioProcessorBase
-import speech_recognition as sr
-import av
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-import pycountry
+import sys
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common.langid import get_identifier
+from common.speech import audio_processor_class
+from geocode import get_geocoder
+from forecast import get_forecast_cache
+from multicity import compare_cities, parse_cities
+from charts import hourly_series, render_png, vega_lite_spec
 
 # Page Setup
 st.set_page_config(page_title="🌤️ Weather Agent", layout="centered")
@@ -23,34 +25,53 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("📌 **Developed by:** Alisha Khan")
     st.markdown("🔖 **Version:** 1.0.0")
+    render_images = st.checkbox("🖼️ Render charts as images", value=False)
     st.markdown("[🌐 GitHub](https://github/AlishhaKhan.com/) | [📧 Contact](alishakhan8627@gmail.com)", unsafe_allow_html=True)
 
+def show_chart(key, series, title, x_title="Time"):
+    """Draw in the browser by default; server-side PNGs are cached per forecast."""
+    if render_images:
+        st.image(render_png(key, series, title, x_title))
+    else:
+        st.vega_lite_chart(vega_lite_spec(series, title, x_title), use_container_width=True)
+
 # ------------------ Title ------------------
 st.title("🌦️ Multilingual Weather Agent")
 st.markdown("Enter or speak a city name below 👇")
 
 # ------------------ Audio Input ------------------
-class AudioProcessor(AudioProcessorBase):
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
+# How often a running microphone stream is checked for recognised speech
+SPEECH_POLL_SECONDS = 1
 
-    def recv(self, frame: av.AudioFrame) -> av.AudioFrame:
-        audio_data = frame.to_ndarray().tobytes()
-        try:
-            audio = sr.AudioData(audio_data, frame.sample_rate, 2)
-            text = self.recognizer.recognize_google(audio)
-            st.session_state["city"] = text
-            st.success(f"🎙️ You said: {text}")
-        except:
-            pass
-        return frame
-
-webrtc_streamer(
-    key="mic",
-    mode=WebRtcMode.SENDONLY,
-    audio_processor_factory=AudioProcessor,
-    media_stream_constraints={"audio": True, "video": False}
-)
+
+@st.fragment(run_every=SPEECH_POLL_SECONDS)
+def listen_for_speech(speech):
+    """Rerun the page once the background recognizer has heard something."""
+    texts = speech.poll()
+    if texts:
+        st.session_state["city"] = texts[-1]
+        st.session_state["heard"] = texts[-1]
+        st.rerun()
+
+
+# The microphone widget shows by default, as it always has; streamlit-webrtc
+# (with PyAV and aiortc) is only imported while voice input is ticked
+if st.checkbox("🎙️ Use voice input", value=True, key="voice_input"):
+    from streamlit_webrtc import webrtc_streamer, WebRtcMode
+
+    speech_ctx = webrtc_streamer(
+        key="mic",
+        mode=WebRtcMode.SENDONLY,
+        audio_processor_factory=audio_processor_class(),
+        media_stream_constraints={"audio": True, "video": False}
+    )
+
+    # Speech is recognised in the background; a fragment checks for it
+    # while the microphone is on and reruns the page with the text
+    if speech_ctx.state.playing and speech_ctx.audio_processor:
+        listen_for_speech(speech_ctx.audio_processor.speech)
+    if "heard" in st.session_state:
+        st.success(f"🎙️ You said: {st.session_state.pop('heard')}")
 
 # ------------------ City Input ------------------
 st.markdown("### 🏙️ City Input")
@@ -58,38 +79,25 @@ city = st.text_input("Type city name:", value=st.session_state.get("city", ""))
 
 # ------------------ Language Detection ------------------
 if city:
+    # Seeded and memoized, so keystroke reruns reuse the answer
     try:
-        code = detect(city)
-        lang_name = Language.get(code).display_name()
-        lang_name_cap = lang_name.capitalize()
-
-        # Try to find country code for flag emoji
-        country = pycountry.languages.get(alpha_2=code)
-        emoji_flag = f":flag-{code}:" if country else ""
-        st.info(f"🌐 Detected Language: {emoji_flag} **{lang_name_cap}**")
-    except:
+        detection = get_identifier().detect(city)
+    except Exception:
+        detection = None
+    if detection:
+        st.info(f"🌐 Detected Language: {detection.flag} **{detection.name}**")
+    else:
         st.warning("⚠️ Could not detect language.")
 
 # ------------------ Weather Data ------------------
 if st.button("☁️ Get Weather") and city:
     with st.spinner("Fetching weather data..."):
         try:
-            geolocator = Nominatim(user_agent="weather-agent")
-            location = geolocator.geocode(city)
+            location = get_geocoder().geocode(city)
             if location:
                 lat, lon = location.latitude, location.longitude
-                api_url = (
-                    f"https://api.open-meteo.com/v1/forecast?"
-                    f"latitude={lat}&longitude={lon}"
-                    f"&current_weather=true&hourly=temperature_2m"
-                    f"&timezone=auto"
-                )
-                response = requests.get(api_url)
-                data = response.json()
-
-                current = data.get("current_weather", {})
-                hourly_temps = data.get("hourly", {}).get("temperature_2m", [])
-                time_stamps = data.get("hourly", {}).get("time", [])
+                forecast = get_forecast_cache().get(lat, lon)
+                current = forecast.current
 
                 st.success("✅ Weather data fetched successfully!")
 
@@ -102,16 +110,42 @@ if st.button("☁️ Get Weather") and city:
 
                 # 📊 Hourly Forecast with Time
                 st.markdown("### 📊 Hourly Temperature Forecast (Next 12 Hours)")
-                times = [datetime.fromisoformat(t) for t in time_stamps[:12]]
-                fig, ax = plt.subplots()
-                ax.plot(times, hourly_temps[:12], marker='o')
-                ax.set_xlabel("Time")
-                ax.set_ylabel("Temperature (°C)")
-                ax.set_title("Hourly Forecast")
-                ax.grid(True)
-                plt.xticks(rotation=30)
-                st.pyplot(fig)
+                show_chart(get_forecast_cache().key(lat, lon), [hourly_series(forecast)], "Hourly Forecast")
+
+                cache_stats = get_forecast_cache().stats()
+                st.caption(f"⚡ Forecast cache hit rate: {cache_stats['hit_rate']:.0%}")
             else:
                 st.error("❌ City not found. Please try again.")
         except Exception as e:
             st.error(f"⚠️ Error: {e}")
+
+# ------------------ Multi-City Comparison ------------------
+st.markdown("### 🌍 Compare Cities")
+city_list = st.text_area("Cities to compare (comma or newline separated):", placeholder="London, Paris, Tokyo")
+
+if st.button("📊 Compare Weather") and city_list.strip():
+    with st.spinner("Fetching weather for all cities..."):
+        results = compare_cities(parse_cities(city_list))
+
+    for result in results:
+        if result.error:
+            st.warning(f"⚠️ {result.city}: {result.error}")
+
+    found = [result for result in results if result.forecast is not None]
+    if found:
+        st.dataframe(
+            [
+                {"City": result.city, "Current Temperature (°C)": result.forecast.current.get("temperature")}
+                for result in found
+            ],
+            hide_index=True,
+        )
+        st.map(data=[{"lat": result.place.latitude, "lon": result.place.longitude} for result in found])
+
+        # Each series is in the city's own timezone, so align them by local hour
+        show_chart(
+            tuple(get_forecast_cache().key(result.place.latitude, result.place.longitude) for result in found),
+            [hourly_series(result.forecast, label=result.city, local_hours=True) for result in found],
+            "Hourly Forecast by City",
+            x_title="Local hour of day",
+        )
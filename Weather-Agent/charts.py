@@ -0,0 +1,121 @@
+import io
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from forecast import seconds_to_next_hour
+
+HOURS = 12
+FIGSIZE = (6.4, 3.6)
+DPI = 100
+IMAGE_CACHE_BYTES = 32 * 1024 * 1024
+
+# Rendered PNGs keyed by forecast-cache key(s), so a cell is drawn once per hour
+_images = LRUCache(max_entries=512, max_bytes=IMAGE_CACHE_BYTES)
+metrics.watch_cache("weather_chart_images", _images.stats)
+
+
+def parse_times(values):
+    """ISO timestamps (or datetime64 values) to a datetime64[m] array in one call."""
+    return np.asarray(values, dtype="datetime64[m]")
+
+
+def hourly_series(forecast, label="Temperature", hours=HOURS, local_hours=False):
+    """
+    The first `hours` of a forecast as a (label, x, temperatures) series.
+
+    With `local_hours`, x is the hour index instead of the timestamp, so
+    cities in different timezones line up on one chart.
+    """
+    temps = forecast.temperatures[:hours]
+    x = np.arange(len(temps)) if local_hours else parse_times(forecast.times[:hours])
+    return label, x, temps
+
+
+def _is_temporal(series):
+    return np.issubdtype(series[0][1].dtype, np.datetime64)
+
+
+def vega_lite_spec(series, title, x_title="Time"):
+    """
+    Vega-Lite line chart for `st.vega_lite_chart`.
+
+    The browser draws it, so the server skips matplotlib and rasterising
+    entirely.
+    """
+    temporal = _is_temporal(series)
+    values = []
+    for label, x, temps in series:
+        xs = np.datetime_as_string(x).tolist() if temporal else x.tolist()
+        for x_value, temp in zip(xs, temps.tolist()):
+            values.append({"series": label, "x": x_value, "temperature": None if math.isnan(temp) else temp})
+
+    encoding = {
+        "x": {"field": "x", "type": "temporal" if temporal else "quantitative", "title": x_title},
+        "y": {"field": "temperature", "type": "quantitative", "title": "Temperature (°C)"},
+        "tooltip": [{"field": "series"}, {"field": "x", "title": x_title}, {"field": "temperature"}],
+    }
+    if len(series) > 1:
+        encoding["color"] = {"field": "series", "type": "nominal", "title": None}
+    return {
+        "title": title,
+        "data": {"values": values},
+        "mark": {"type": "line", "point": True},
+        "encoding": encoding,
+    }
+
+
+def render_png(key, series, title, x_title="Time"):
+    """
+    Cached PNG of the series.
+
+    Args:
+        key: Forecast-cache key(s) the series came from; it already carries
+            the forecast hour, so a new forecast gets a new image.
+        series (list): (label, x, temperatures) tuples from `hourly_series`.
+
+    Returns:
+        bytes: PNG image for `st.image`.
+    """
+    cache_key = (key, title, x_title, tuple(label for label, _, _ in series))
+    png = _images.get(cache_key)
+    if png is None:
+        png = _render(series, title, x_title)
+        _images.put(cache_key, png, ttl=seconds_to_next_hour())
+    return png
+
+
+@metrics.traced("weather_chart_render")
+def _render(series, title, x_title):
+    # Imported on first render so app startup does not pay for matplotlib.
+    # A bare Figure is not tracked by pyplot, so it is freed once rendered
+    # instead of accumulating in a long-lived worker.
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=FIGSIZE, dpi=DPI)
+    ax = fig.subplots()
+    for label, x, temps in series:
+        ax.plot(x, temps, marker="o", label=label)
+    ax.set_xlabel(x_title)
+    ax.set_ylabel("Temperature (°C)")
+    ax.set_title(title)
+    ax.grid(True)
+    if len(series) > 1:
+        ax.legend(fontsize="small", ncol=2)
+    if _is_temporal(series):
+        fig.autofmt_xdate(rotation=30)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def image_cache_stats():
+    return _images.stats()
@@ -0,0 +1,172 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+
+# Override to point the agent at a local fake server
+API_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Open-Meteo's models are no finer than ~0.1°, so nearby lookups share data
+GRID_DEGREES = 0.1
+TIMEOUT = (5, 15)
+CACHE_ENTRIES = 4096
+# Coordinates per multi-location request, keeping the URL a sane length
+MAX_LOCATIONS_PER_REQUEST = 50
+MAX_CONCURRENT_REQUESTS = 4
+
+
+class Forecast:
+    """
+    Hourly forecast for one grid cell, stored compactly.
+
+    Timestamps are a NumPy datetime64 array and temperatures a float32
+    array (missing values are NaN), instead of lists of JSON strings and
+    floats.
+    """
+
+    __slots__ = ("latitude", "longitude", "current", "times", "temperatures")
+
+    def __init__(self, latitude, longitude, current, times, temperatures):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.current = current
+        self.times = times
+        self.temperatures = temperatures
+
+    @classmethod
+    def from_response(cls, data):
+        hourly = data.get("hourly", {})
+        return cls(
+            data.get("latitude"),
+            data.get("longitude"),
+            data.get("current_weather", {}),
+            np.array(hourly.get("time", []), dtype="datetime64[m]"),
+            np.array(hourly.get("temperature_2m", []), dtype=np.float64).astype(np.float32),
+        )
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.temperatures.nbytes + 256
+
+
+def grid_point(lat, lon, grid=GRID_DEGREES):
+    """Snap coordinates to the forecast grid."""
+    return round(round(lat / grid) * grid, 4), round(round(lon / grid) * grid, 4)
+
+
+def seconds_to_next_hour(now=None):
+    now = time.time() if now is None else now
+    return 3600 - now % 3600
+
+
+class ForecastCache:
+    """
+    Open-Meteo hourly forecasts cached per grid cell and forecast hour.
+
+    The key is the rounded coordinates plus the current UTC hour, and each
+    entry expires at the top of the next hour, when the upstream forecast
+    may have changed. Misses go through one pooled HTTP session with
+    timeouts.
+    """
+
+    def __init__(self, session=None, api_url=API_URL, grid=GRID_DEGREES, max_entries=CACHE_ENTRIES):
+        self.api_url = api_url
+        self.grid = grid
+        self.cache = LRUCache(max_entries=max_entries, sizeof=lambda forecast: forecast.nbytes)
+        self.session = session or self._new_session()
+        self._slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+    @staticmethod
+    def _new_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def key(self, lat, lon, now=None):
+        now = time.time() if now is None else now
+        return (*grid_point(lat, lon, self.grid), int(now // 3600))
+
+    def get(self, lat, lon):
+        """Forecast for the grid cell containing (lat, lon)."""
+        key = self.key(lat, lon)
+        forecast = self.cache.get(key)
+        if forecast is None:
+            forecast = self.fetch(key[0], key[1])
+            self.cache.put(key, forecast, ttl=seconds_to_next_hour())
+        return forecast
+
+    def fetch(self, lat, lon):
+        return self.fetch_many([(lat, lon)])[0]
+
+    def fetch_many(self, points):
+        """Fetch several locations with one multi-location request."""
+        with self._slots, metrics.span("weather_forecast", locations=len(points)):
+            response = self.session.get(
+                self.api_url,
+                params={
+                    "latitude": ",".join(str(lat) for lat, _ in points),
+                    "longitude": ",".join(str(lon) for _, lon in points),
+                    "current_weather": "true",
+                    "hourly": "temperature_2m",
+                    "timezone": "auto",
+                },
+                timeout=TIMEOUT,
+            )
+        metrics.count("http_requests_total", service="open_meteo", status=response.status_code)
+        response.raise_for_status()
+        data = response.json()
+        # A single location comes back as an object, several as a list
+        return [Forecast.from_response(item) for item in (data if isinstance(data, list) else [data])]
+
+    def get_many(self, points, run=map):
+        """
+        Forecasts for many (lat, lon) points, fetching all misses with as few
+        multi-location requests as possible.
+
+        Args:
+            points (list): (lat, lon) pairs.
+            run (callable): `map`-like function used to issue the requests,
+                e.g. a thread pool's `map` to send them concurrently.
+
+        Returns:
+            list: Forecasts aligned with `points`.
+        """
+        keys = [self.key(lat, lon) for lat, lon in points]
+        found = {key: self.cache.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, forecast in found.items() if forecast is None]
+
+        chunks = [
+            missing[start:start + MAX_LOCATIONS_PER_REQUEST]
+            for start in range(0, len(missing), MAX_LOCATIONS_PER_REQUEST)
+        ]
+        ttl = seconds_to_next_hour()
+        for chunk, forecasts in zip(chunks, run(self.fetch_many, [[key[:2] for key in chunk] for chunk in chunks])):
+            for key, forecast in zip(chunk, forecasts):
+                found[key] = forecast
+                self.cache.put(key, forecast, ttl=ttl)
+        return [found[key] for key in keys]
+
+    def stats(self):
+        """Hit/miss counters and hit rate of the cache."""
+        return self.cache.stats()
+
+
+@shared
+def get_forecast_cache():
+    forecasts = ForecastCache()
+    metrics.watch_cache("weather_forecast", forecasts.stats)
+    return forecasts
@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import Future
+from pathlib import Path
+
+# Make the repo-level `common` package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from common import metrics
+from common.lru import LRUCache
+from common.shared import shared
+
+APP_DIR = Path(__file__).resolve().parent
+DB_PATH = APP_DIR / "geocode_cache.db"
+SEED_PATH = APP_DIR / "data" / "cities.json"
+
+USER_AGENT = "weather-agent"
+TTL_SECONDS = 30 * 24 * 3600
+NOT_FOUND_TTL_SECONDS = 24 * 3600
+MEMORY_ENTRIES = 2048
+
+# Same attribute names as geopy's Location, so callers can use either
+Place = namedtuple("Place", ["latitude", "longitude", "address"])
+
+_NOT_FOUND = object()
+
+
+def normalise_city(name):
+    """Cache key for a city name: case, accents-as-typed, spacing and trailing punctuation ignored."""
+    name = unicodedata.normalize("NFKC", name).casefold()
+    return " ".join(name.split()).strip(" .,;!?")
+
+
+class GeocodeCache:
+    """
+    Caching front end for Nominatim.
+
+    Lookups go through an in-memory LRU, an optional offline seed file of
+    common cities, and a persistent SQLite store, all keyed by the
+    normalised city name. Only misses reach Nominatim, rate limited to its
+    one-request-per-second policy, and concurrent lookups of the same key
+    share a single request. Entries expire after `ttl` seconds; cities that
+    were not found are remembered for a shorter time. A lookup that fails
+    (timeout, rate limit, service error) raises and caches nothing.
+    """
+
+    def __init__(self, geocoder=None, db_path=DB_PATH, seed_path=SEED_PATH, ttl=TTL_SECONDS):
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries=MEMORY_ENTRIES, ttl=ttl)
+        self.seed = self._load_seed(seed_path)
+        self.remote_lookups = 0
+        self._geocoder = geocoder
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY,
+                latitude REAL,
+                longitude REAL,
+                address TEXT,
+                expires_at REAL
+            )
+        ''')
+        self._db.commit()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Nominatim's usage policy: one request at a time
+        self._remote_slot = threading.Lock()
+
+    @staticmethod
+    def _load_seed(seed_path):
+        if not seed_path or not Path(seed_path).exists():
+            return {}
+        with open(seed_path, "r", encoding="utf-8") as file:
+            return {normalise_city(name): Place(**place) for name, place in json.load(file).items()}
+
+    @property
+    def geocoder(self):
+        """
+        Nominatim client, created once and rate limited to 1 request/second.
+
+        Errors that outlast the limiter's retries are raised, not turned
+        into None, so an outage is never cached as "not found".
+        """
+        if self._geocoder is None:
+            from geopy.extra.rate_limiter import RateLimiter
+            from geopy.geocoders import Nominatim
+
+            self._geocoder = RateLimiter(
+                Nominatim(user_agent=USER_AGENT, timeout=10).geocode, min_delay_seconds=1, swallow_exceptions=False
+            )
+        return self._geocoder
+
+    def geocode(self, city):
+        """
+        Coordinates for a city name.
+
+        Returns:
+            Place: latitude, longitude and address, or None if not found.
+        """
+        key = normalise_city(city)
+        cached = self.memory.get(key)
+        if cached is None:
+            cached = self.seed.get(key) or self._load(key)
+            if cached is not None:
+                self.memory.put(key, cached)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+
+        # Single flight: only the first caller for a key asks Nominatim
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            just_stored = future is None and key in self.memory
+            leader = future is None and not just_stored
+            if leader:
+                future = self._inflight[key] = Future()
+        if just_stored:
+            return self.geocode(city)  # A lookup for this key finished meanwhile
+        if not leader:
+            return future.result()
+
+        try:
+            place = self._lookup(city)
+            self._store(key, place)
+            future.set_result(place)
+            return place
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _lookup(self, city):
+        with self._remote_slot:
+            self.remote_lookups += 1
+            with metrics.span("weather_geocode"):
+                location = self.geocoder(city)
+        if location is None:
+            return None
+        return Place(location.latitude, location.longitude, location.address)
+
+    def _load(self, key):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT latitude, longitude, address FROM geocode WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return _NOT_FOUND if row[0] is None else Place(*row)
+
+    def _store(self, key, place):
+        ttl = self.ttl if place is not None else NOT_FOUND_TTL_SECONDS
+        row = place or (None, None, None)
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+                (key, *row, time.time() + ttl),
+            )
+            self._db.execute("DELETE FROM geocode WHERE expires_at <= ?", (time.time(),))
+        self.memory.put(key, place if place is not None else _NOT_FOUND, ttl=ttl)
+
+    def stats(self):
+        return {**self.memory.stats(), "remote_lookups": self.remote_lookups}
+
+
+@shared
+def get_geocoder():
+    geocoder = GeocodeCache()
+    metrics.watch_cache("weather_geocode", geocoder.stats)
+    return geocoder
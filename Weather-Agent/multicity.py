@@ -0,0 +1,60 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast import get_forecast_cache
+from geocode import get_geocoder
+
+MAX_WORKERS = 16
+
+CityWeather = namedtuple("CityWeather", ["city", "place", "forecast", "error"])
+
+
+def parse_cities(text):
+    """Split a comma- or newline-separated list, dropping blanks and repeats."""
+    names = (name.strip() for line in text.splitlines() for name in line.split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def compare_cities(cities, geocoder=None, forecasts=None, max_workers=MAX_WORKERS):
+    """
+    Current weather and hourly forecast for many cities at once.
+
+    Every city is geocoded concurrently on a bounded thread pool. All
+    forecast misses are then fetched with Open-Meteo multi-location
+    requests, sent concurrently, so the total time is close to that of the
+    slowest request rather than the sum of all of them. Per-host limits
+    live in the clients: GeocodeCache sends one Nominatim request at a time
+    (cache and seed hits never wait for it) and ForecastCache caps
+    concurrent Open-Meteo requests.
+
+    Returns:
+        list: One CityWeather per city, in input order. `error` is set when
+            the city could not be found or fetched.
+    """
+    geocoder = geocoder or get_geocoder()
+    forecasts = forecasts or get_forecast_cache()
+
+    def locate(city):
+        try:
+            return geocoder.geocode(city), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        located = list(pool.map(locate, cities))
+        found = [(city, place) for city, (place, _) in zip(cities, located) if place is not None]
+        try:
+            points = [(place.latitude, place.longitude) for _, place in found]
+            results = forecasts.get_many(points, run=pool.map)
+            by_city = {city: (forecast, None) for (city, _), forecast in zip(found, results)}
+        except Exception as e:
+            by_city = {city: (None, e) for city, _ in found}
+
+    weather = []
+    for city, (place, error) in zip(cities, located):
+        if place is None:
+            weather.append(CityWeather(city, None, None, error or LookupError("City not found")))
+        else:
+            forecast, error = by_city[city]
+            weather.append(CityWeather(city, place, forecast, error))
+    return weather
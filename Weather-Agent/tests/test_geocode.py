@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+from geocode import GeocodeCache
+
+
+class Geocoder:
+    """Fake geocoder that fails for the first `failures` calls."""
+
+    def __init__(self, places, failures=0):
+        self.places = places
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, city):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("Nominatim timed out")
+        place = self.places.get(city)
+        return SimpleNamespace(**place) if place else None
+
+
+LAHORE = {"latitude": 31.55, "longitude": 74.34, "address": "Lahore, Pakistan"}
+
+
+def make_cache(tmp_path, geocoder):
+    return GeocodeCache(geocoder=geocoder, db_path=tmp_path / "geocode.db", seed_path=None)
+
+
+def test_failed_lookup_caches_nothing(tmp_path):
+    geocoder = Geocoder({"Lahore": LAHORE}, failures=1)
+    cache = make_cache(tmp_path, geocoder)
+
+    with pytest.raises(TimeoutError):
+        cache.geocode("Lahore")
+    assert "lahore" not in cache.memory
+    assert cache._load("lahore") is None
+
+    assert cache.geocode("Lahore").address == "Lahore, Pakistan"
+    assert geocoder.calls == 2
+
+
+def test_found_and_not_found_are_cached(tmp_path):
+    geocoder = Geocoder({"Lahore": LAHORE})
+    cache = make_cache(tmp_path, geocoder)
+
+    assert cache.geocode("Lahore").latitude == 31.55
+    assert cache.geocode("Atlantis") is None
+    assert cache.geocode("  LAHORE ") is not None and cache.geocode("atlantis") is None
+    assert geocoder.calls == 2
+
+    reopened = make_cache(tmp_path, Geocoder({}))
+    assert reopened.geocode("lahore").address == "Lahore, Pakistan"
+    assert reopened.geocode("Atlantis") is None
+    assert reopened.remote_lookups == 0
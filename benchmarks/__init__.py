@@ -0,0 +1,11 @@
+"""
+Offline benchmarks for the four agents.
+
+Every external service is replaced by a local stand-in (see fakes.py) with
+configurable latency and payload size, and the corpora are synthetic, so
+runs are reproducible without API keys or network access. Run with
+
+    python -m benchmarks --scale 1k
+
+and compare two result files with `--compare old.json new.json`.
+"""
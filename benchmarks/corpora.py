@@ -0,0 +1,103 @@
+"""Synthetic, deterministic corpora for the benchmarks."""
+
+import random
+
+FIRST_NAMES = (
+    "Alisha", "Omar", "Sara", "Liam", "Mei", "Ravi", "Zara", "Noah", "Ines", "Kofi",
+    "Hana", "Mateo", "Aylin", "Yusuf", "Elena", "Tariq", "Nina", "Jonas", "Amara", "Leo",
+)
+LOCATIONS = (
+    "Karachi", "Lahore", "London", "Paris", "Berlin", "Toronto", "Dubai", "Istanbul",
+    "Tokyo", "Sydney", "Nairobi", "Madrid", "Chicago", "Seoul", "Cairo", "Lisbon",
+)
+INTERESTS = (
+    "hiking", "cooking", "reading", "poetry", "travel", "photography", "chess", "music",
+    "guitar", "painting", "yoga", "running", "cycling", "gaming", "movies", "gardening",
+    "astronomy", "coffee", "baking", "dancing", "football", "cricket", "tennis", "swimming",
+    "volunteering", "history", "languages", "fashion", "technology", "animals",
+)
+TRAITS = (
+    "kind", "curious", "adventurous", "calm", "funny", "ambitious", "creative", "loyal",
+    "honest", "thoughtful", "energetic", "patient", "optimistic", "romantic", "independent",
+)
+WORDS = (
+    "research", "model", "data", "system", "energy", "climate", "market", "policy", "health",
+    "quantum", "network", "learning", "growth", "study", "results", "report", "analysis",
+    "future", "global", "local", "impact", "risk", "method", "design", "city", "water",
+    "science", "public", "private", "security", "language", "history", "culture", "travel",
+)
+LANGUAGES = ("French", "Spanish", "German", "Urdu", "Arabic", "Turkish", "Japanese", "Chinese")
+
+
+def sentence(rng, words=WORDS, length=(8, 18)):
+    count = rng.randint(*length)
+    return " ".join(rng.choice(words) for _ in range(count)).capitalize() + "."
+
+
+def profile(rng, profile_id):
+    interests = rng.sample(INTERESTS, 3)
+    traits = rng.sample(TRAITS, 2)
+    bio = (
+        f"I am a {traits[0]} and {traits[1]} person who loves {interests[0]}, {interests[1]} "
+        f"and {interests[2]}. Looking for someone {rng.choice(TRAITS)} who enjoys "
+        f"{rng.choice(INTERESTS)} and {rng.choice(INTERESTS)}."
+    )
+    return {
+        "id": profile_id,
+        "name": f"{rng.choice(FIRST_NAMES)} {profile_id}",
+        "age": rng.randint(18, 60),
+        "gender": rng.choice(("Female", "Male", "Other")),
+        "location": rng.choice(LOCATIONS),
+        "interests": interests,
+        "bio": bio,
+    }
+
+
+def profiles(n, seed=0):
+    """`n` profile dicts shaped like data/profiles.json."""
+    rng = random.Random(seed)
+    return [profile(rng, profile_id) for profile_id in range(n)]
+
+
+def user_bios(n, seed=1):
+    """Bios of users looking for matches."""
+    rng = random.Random(seed)
+    return [profile(rng, -1)["bio"] for _ in range(n)]
+
+
+def translations(n, seed=0, chunk=10_000):
+    """
+    A translation history of `n` (input, output, target_lang) rows, in
+    chunks so a 1M-row history never has to sit in memory at once.
+    """
+    rng = random.Random(seed)
+    for start in range(0, n, chunk):
+        rows = []
+        for number in range(start, min(start + chunk, n)):
+            text = f"{sentence(rng)} ({number})"
+            language = rng.choice(LANGUAGES)
+            rows.append((text, f"[{language}] {text}", language))
+        yield rows
+
+
+def segments(n, seed=2, repeat_ratio=0.2):
+    """Texts for batch translation, with some repeated as real files are."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        if texts and rng.random() < repeat_ratio:
+            texts.append(rng.choice(texts))
+        else:
+            texts.append(sentence(rng))
+    return texts
+
+
+def cities(n):
+    """City names: real names first, then numbered synthetic ones."""
+    return [f"{LOCATIONS[number % len(LOCATIONS)]} {number}" if number >= len(LOCATIONS)
+            else LOCATIONS[number] for number in range(n)]
+
+
+def topics(n, seed=4):
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(WORDS, 3)) for _ in range(n)]
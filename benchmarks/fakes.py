@@ -0,0 +1,273 @@
+"""
+Local stand-ins for the external services the agents call.
+
+Each fake is a real HTTP server on 127.0.0.1 so the apps' own clients,
+connection pools and timeouts are exercised. `latency` (seconds) is slept
+per request and `payload_bytes` sets the size of generated text.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from benchmarks.corpora import sentence
+
+MARKER_PATTERN = re.compile(r"^<<<(\d+)>>>$", re.MULTILINE)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # Otherwise small responses wait on delayed ACKs
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null") if length else None
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests += 1
+        if fake.latency:
+            time.sleep(fake.latency * random.uniform(1 - fake.jitter, 1 + fake.jitter))
+        status, payload = fake.handle(method, url.path, parse_qs(url.query), body)
+
+        if isinstance(payload, (list, dict)):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        # Server-sent events, one chunk at a time
+        self.send_response(status)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in payload:
+            data = f"data: {event}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeServer:
+    """Base class: a threaded HTTP server whose responses come from `handle`."""
+
+    def __init__(self, latency=0.05, payload_bytes=2000, jitter=0.1):
+        self.latency = latency
+        self.payload_bytes = payload_bytes
+        self.jitter = jitter
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._server = None
+
+    def handle(self, method, path, query, body):
+        raise NotImplementedError
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def text(self, seed, size=None):
+        """Deterministic filler text of about `size` bytes."""
+        rng = random.Random(seed)
+        size = self.payload_bytes if size is None else size
+        parts, total = [], 0
+        while total < size:
+            parts.append(sentence(rng))
+            total += len(parts[-1]) + 1
+        return " ".join(parts)
+
+
+def _seed(*values):
+    return int.from_bytes(hashlib.sha256("\x1f".join(map(str, values)).encode()).digest()[:8], "big")
+
+
+class FakeGemini(FakeServer):
+    """generateContent: echoes `<<<n>>>` markers so batched translation parses."""
+
+    def handle(self, method, path, query, body):
+        prompt = body["contents"][0]["parts"][0]["text"]
+        markers = MARKER_PATTERN.findall(prompt)
+        if markers:
+            segments = MARKER_PATTERN.split(prompt)[1:]
+            text = "\n".join(
+                f"<<<{number}>>>\n[translated] {segment.strip()}"
+                for number, segment in zip(segments[::2], segments[1::2])
+            )
+        else:
+            text = self.text(_seed(prompt))
+        return 200, {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+class FakeOpenMeteo(FakeServer):
+    """Forecast API, including comma-separated multi-location requests."""
+
+    def __init__(self, hours=168, **options):
+        super().__init__(**options)
+        self.hours = hours
+
+    def handle(self, method, path, query, body):
+        latitudes = query["latitude"][0].split(",")
+        longitudes = query["longitude"][0].split(",")
+        start = time.strftime("%Y-%m-%d", time.gmtime())
+        times = [f"{start}T{hour % 24:02d}:00" for hour in range(self.hours)]
+        items = []
+        for lat, lon in zip(latitudes, longitudes):
+            rng = random.Random(_seed(lat, lon))
+            base = rng.uniform(-10, 35)
+            items.append({
+                "latitude": float(lat),
+                "longitude": float(lon),
+                "current_weather": {"temperature": round(base, 1), "windspeed": round(rng.uniform(0, 40), 1)},
+                "hourly": {
+                    "time": times,
+                    "temperature_2m": [round(base + rng.uniform(-3, 3), 1) for _ in times],
+                },
+            })
+        return 200, items if len(items) > 1 else items[0]
+
+
+class FakeNominatim(FakeServer):
+    """/search?q=...&format=json with deterministic coordinates per name."""
+
+    def handle(self, method, path, query, body):
+        name = query.get("q", [""])[0]
+        if not name or name.casefold().startswith("nowhere"):
+            return 200, []
+        rng = random.Random(_seed(name.casefold()))
+        return 200, [{
+            "lat": str(round(rng.uniform(-60, 70), 5)),
+            "lon": str(round(rng.uniform(-180, 180), 5)),
+            "display_name": f"{name}, Benchmark Country",
+        }]
+
+
+class FakeTavily(FakeServer):
+    """
+    /search with `max_results` results of about `payload_bytes` each.
+
+    Results draw on a shared pool of pages, so different sub-queries
+    return overlapping content, as real searches do.
+    """
+
+    def __init__(self, pool_size=40, **options):
+        super().__init__(**options)
+        self.pool_size = pool_size
+
+    def handle(self, method, path, query, body):
+        rng = random.Random(_seed(body["query"]))
+        pages = rng.sample(range(self.pool_size), min(body.get("max_results", 5), self.pool_size))
+        return 200, {"results": [
+            {"url": f"https://example.com/page/{page}", "title": f"Page {page}", "content": self.text(page)}
+            for page in pages
+        ]}
+
+
+class FakeOpenAI(FakeServer):
+    """/v1/chat/completions, streamed as SSE with `token_latency` between tokens."""
+
+    def __init__(self, token_latency=0.005, **options):
+        super().__init__(**options)
+        self.token_latency = token_latency
+
+    def handle(self, method, path, query, body):
+        prompt = json.dumps(body["messages"])
+        words = self.text(_seed(prompt)).split(" ")
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(words), "total_tokens": 0}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "fake")}
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": " ".join(words)}
+            return 200, {**base, "object": "chat.completion",
+                         "choices": [{"index": 0, "message": message, "finish_reason": "stop"}], "usage": usage}
+
+        def events():
+            for n, word in enumerate(words):
+                time.sleep(self.token_latency)
+                delta = {"content": word if n == 0 else " " + word}
+                yield json.dumps({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            yield json.dumps({**base, "choices": [], "usage": usage})
+            yield "[DONE]"
+        return 200, events()
+
+
+# ---------- Clients for the callables the pipelines take ----------
+def tavily_search(url, session=None):
+    """`search(query, num_results)` backed by a FakeTavily server."""
+    session = session or requests.Session()
+
+    def search(query, num_results=3):
+        response = session.post(f"{url}/search", json={"query": query, "max_results": num_results}, timeout=30)
+        response.raise_for_status()
+        return response.json()["results"]
+    return search
+
+
+def gemini_llm(url, session=None):
+    """`llm(messages) -> text` backed by a FakeGemini server; system messages become the system instruction."""
+    session = session or requests.Session()
+
+    def generate(messages):
+        system = "\n".join(text for role, text in messages if role == "system")
+        prompt = "\n\n".join(text for role, text in messages if role != "system")
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        response = session.post(url, json=body, timeout=60)
+        response.raise_for_status()
+        return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+    return generate
+
+
+def nominatim_geocoder(url, session=None):
+    """Geocoder callable for GeocodeCache, backed by a FakeNominatim server."""
+    session = session or requests.Session()
+
+    def geocode(city):
+        response = session.get(f"{url}/search", params={"q": city, "format": "json", "limit": 1}, timeout=10)
+        response.raise_for_status()
+        found = response.json()
+        if not found:
+            return None
+        return SimpleNamespace(
+            latitude=float(found[0]["lat"]), longitude=float(found[0]["lon"]), address=found[0]["display_name"]
+        )
+    return geocode
@@ -0,0 +1,168 @@
+"""
+Import-time profile of each app's Streamlit script.
+
+    python -m benchmarks.imports                      # every app
+    python -m benchmarks.imports --apps research --top 20
+    python -m benchmarks.imports --budget-ms 1500     # exit 1 if any app is slower
+
+Only the script's top-level imports run (under `python -X importtime`, in a
+fresh interpreter), so the numbers show what a cold start pays before the
+page can render, without API keys or a Streamlit server. Streamlit re-runs
+the script on every interaction, but imported modules stay loaded, so this
+is also the floor for anything added to the script's top level.
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.suites import ROOT
+
+APPS = {
+    "matchmaker": ("Matchmaker-Agent", "ui.py"),
+    "translator": ("Multilingual-translator", "app.py"),
+    "weather": ("Weather-Agent", "app.py"),
+    "research": ("Research-Agent", "main.py"),
+}
+
+MARKER = "--- app imports ---"
+
+# Runs in the child: the script's import statements, timed one by one
+_PROBE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+sys.stderr.write({marker!r} + "\\n")
+report = {{"statements": [], "missing": []}}
+started = time.perf_counter()
+for statement in {statements!r}:
+    begin = time.perf_counter()
+    try:
+        exec(statement, {{}})
+    except ImportError as e:
+        report["missing"].append(e.name or str(e))
+    report["statements"].append((statement, time.perf_counter() - begin))
+report["seconds"] = time.perf_counter() - started
+print(json.dumps(report))
+"""
+
+# Runs in the child: the whole script under Streamlit's test harness, once
+# cold and then as reruns, like a user interacting with the page
+_RERUN_PROBE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+try:
+    from streamlit.testing.v1 import AppTest
+except ImportError:
+    print(json.dumps({{"missing": "streamlit"}}))
+    raise SystemExit
+app = AppTest.from_file({script!r}, default_timeout=60)
+seconds = []
+for _ in range({runs}):
+    started = time.perf_counter()
+    app.run()
+    seconds.append(time.perf_counter() - started)
+print(json.dumps({{"seconds": seconds, "exceptions": [str(e.value) for e in app.exception]}}))
+"""
+
+
+def top_level_imports(path):
+    """Source of every import statement at the top level of a script."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us, depth) rows after the probe's marker."""
+    rows, started = [], False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile(app):
+    """
+    Import profile of one app in a fresh interpreter.
+
+    Returns:
+        dict: Wall seconds, per-statement seconds, modules that could not
+            be imported and the importtime rows.
+    """
+    directory, script = APPS[app]
+    statements = top_level_imports(ROOT / directory / script)
+    probe = _PROBE.format(
+        paths=[str(ROOT / directory), str(ROOT)], marker=MARKER, statements=statements
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT / directory, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"❌ Import probe for {app} failed:\n{completed.stderr[-2000:]}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["modules"] = parse_importtime(completed.stderr)
+    return report
+
+
+def rerun_times(app, runs=10):
+    """
+    Seconds per full script run under `streamlit.testing`, in a fresh
+    interpreter; the first run is the cold start.
+
+    Returns:
+        dict: `seconds` and any `exceptions` the page showed, or `missing`
+            when Streamlit is not installed.
+    """
+    directory, script = APPS[app]
+    probe = _RERUN_PROBE.format(
+        paths=[str(ROOT / directory), str(ROOT)], script=str(ROOT / directory / script), runs=runs
+    )
+    # Run from a scratch directory so relative database paths stay out of the repo
+    with tempfile.TemporaryDirectory(prefix=f"rerun-{app}-") as workdir:
+        completed = subprocess.run([sys.executable, "-c", probe], cwd=workdir, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"❌ Rerun probe for {app} failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_report(app, report, top):
+    print(f"\n{app}: {report['seconds'] * 1000:.1f} ms for {len(report['statements'])} import statements")
+    if report["missing"]:
+        print(f"  not installed here: {', '.join(sorted(set(report['missing'])))}")
+    print("  slowest statements:")
+    for statement, seconds in sorted(report["statements"], key=lambda row: -row[1])[:top]:
+        print(f"    {seconds * 1000:>9.1f} ms  {statement}")
+    print("  slowest modules (self time):")
+    for name, self_us, cumulative_us, _ in sorted(report["modules"], key=lambda row: -row[1])[:top]:
+        print(f"    {self_us / 1000:>9.1f} ms  {name}  (cumulative {cumulative_us / 1000:.1f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.imports", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=list(APPS))
+    parser.add_argument("--top", type=int, default=10, help="Rows per table.")
+    parser.add_argument("--budget-ms", type=float, help="Fail if any app's imports take longer than this.")
+    options = parser.parse_args(argv)
+
+    over_budget = []
+    for app in options.apps:
+        report = profile(app)
+        print_report(app, report, options.top)
+        if options.budget_ms is not None and report["seconds"] * 1000 > options.budget_ms:
+            over_budget.append(app)
+    if over_budget:
+        print(f"\n❌ Over the {options.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+class Stage:
+    """
+    Latency samples of one benchmark stage.
+
+    Each sample may cover several items (rows inserted, queries scored), so
+    throughput is reported in items per second of measured time.
+    """
+
+    def __init__(self, suite, name):
+        self.suite = suite
+        self.name = name
+        self.latencies = []
+        self.items = 0
+
+    @contextmanager
+    def time(self, items=1):
+        started = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - started)
+        self.items += items
+
+    def result(self):
+        if not self.latencies:
+            return {"suite": self.suite, "stage": self.name, "skipped": "no samples"}
+        samples = np.array(self.latencies) * 1000
+        total = sum(self.latencies)
+        return {
+            "suite": self.suite,
+            "stage": self.name,
+            "count": len(samples),
+            "items": self.items,
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p90_ms": float(np.percentile(samples, 90)),
+            "p99_ms": float(np.percentile(samples, 99)),
+            "mean_ms": float(samples.mean()),
+            "max_ms": float(samples.max()),
+            "throughput_per_s": self.items / total if total else None,
+            # Process-wide peak so far; each suite runs in a fresh process
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+
+class Recorder:
+    """Collects the stage results of one suite."""
+
+    def __init__(self, suite):
+        self.suite = suite
+        self.results = []
+
+    def measure(self, name, fn, args_list, items=1, warmup=0):
+        """
+        Time `fn(*args)` for every args tuple in `args_list`.
+
+        Returns:
+            list: The return values, in order.
+        """
+        args_list = list(args_list)
+        for args in args_list[:warmup]:
+            fn(*args)
+        stage = Stage(self.suite, name)
+        outputs = []
+        for args in args_list:
+            with stage.time(items):
+                outputs.append(fn(*args))
+        self.results.append(stage.result())
+        return outputs
+
+    def record(self, name, seconds, items=1):
+        """Add a stage from latencies measured elsewhere, e.g. time to first token."""
+        stage = Stage(self.suite, name)
+        stage.latencies = list(seconds)
+        stage.items = items * len(stage.latencies)
+        self.results.append(stage.result())
+        return self.results[-1]
+
+    def once(self, name, fn, *args, items=1):
+        """Time a single call, e.g. building an index."""
+        return self.measure(name, fn, [args], items=items)[0]
+
+    def skip(self, name, reason):
+        self.results.append({"suite": self.suite, "stage": name, "skipped": reason})
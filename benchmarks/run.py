@@ -0,0 +1,147 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks --scale 1k                      # every suite
+    python -m benchmarks --scale 100k --suites matchmaker translator
+    python -m benchmarks --compare old.json new.json
+
+Each suite runs in a fresh interpreter, so its peak RSS is its own and the
+apps' same-named modules never meet. Results are written as JSON.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+from benchmarks.measure import SCALES, Recorder
+from benchmarks.suites import ROOT, SUITES
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline benchmarks for the agents.")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="Profile and translation corpus size.")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--queries", type=int, default=200, help="Samples per latency stage.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake service latency in seconds.")
+    parser.add_argument("--payload-bytes", type=int, default=2000, help="Size of generated text responses.")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<time>-<scale>.json).")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASELINE", "CANDIDATE"))
+    parser.add_argument("--worker", choices=SUITES, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def run_suite(suite, options):
+    """Run one suite in this process and return its stage results."""
+    module = importlib.import_module(f"benchmarks.suites.{suite}")
+    recorder = Recorder(suite)
+    try:
+        module.run(recorder, SCALES[options.scale], options)
+    except Exception as e:
+        traceback.print_exc()
+        recorder.results.append({"suite": suite, "stage": "error", "error": repr(e)})
+    return recorder.results
+
+
+def run_in_subprocess(suite, options):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as file:
+        output = Path(file.name)
+    command = [
+        sys.executable, "-m", "benchmarks",
+        "--worker", suite,
+        "--scale", options.scale,
+        "--queries", str(options.queries),
+        "--latency", str(options.latency),
+        "--payload-bytes", str(options.payload_bytes),
+        "--output", str(output),
+    ]
+    completed = subprocess.run(command, cwd=ROOT)
+    if completed.returncode != 0 or not output.stat().st_size:
+        return [{"suite": suite, "stage": "error", "error": f"exit status {completed.returncode}"}]
+    results = json.loads(output.read_text())
+    output.unlink()
+    return results
+
+
+def metadata(options):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": options.scale,
+        "queries": options.queries,
+        "latency_s": options.latency,
+        "payload_bytes": options.payload_bytes,
+    }
+
+
+def print_results(results):
+    for result in results:
+        name = f"{result['suite']}/{result['stage']}"
+        if "p50_ms" in result:
+            throughput = result["throughput_per_s"] or 0
+            recall = f"  recall@5 {result['recall_at_5']:.3f}" if "recall_at_5" in result else ""
+            print(
+                f"{name:<45} p50 {result['p50_ms']:>10.2f} ms  p99 {result['p99_ms']:>10.2f} ms  "
+                f"{throughput:>12.1f}/s  rss {result['peak_rss_mb']:>8.1f} MiB{recall}"
+            )
+        else:
+            print(f"{name:<45} {result.get('skipped') or result.get('error')}")
+
+
+def compare(baseline_path, candidate_path):
+    """Print p50 and throughput changes per stage between two result files."""
+    baseline = {(r["suite"], r["stage"]): r for r in json.loads(baseline_path.read_text())["stages"]}
+    candidate = json.loads(candidate_path.read_text())["stages"]
+    for result in candidate:
+        before = baseline.get((result["suite"], result["stage"]))
+        if not before or "p50_ms" not in result or "p50_ms" not in before:
+            continue
+        print(
+            f"{result['suite'] + '/' + result['stage']:<45} "
+            f"p50 {before['p50_ms']:>10.2f} -> {result['p50_ms']:>10.2f} ms ({_change(before, result, 'p50_ms')})  "
+            f"throughput {_change(before, result, 'throughput_per_s')}"
+        )
+
+
+def _change(before, after, field):
+    if not before.get(field) or after.get(field) is None:
+        return "   n/a"
+    return f"{(after[field] - before[field]) / before[field] * 100:+6.1f}%"
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.compare:
+        compare(*options.compare)
+        return
+
+    if options.worker:
+        options.output.write_text(json.dumps(run_suite(options.worker, options)))
+        return
+
+    stages = []
+    for suite in options.suites:
+        print(f"Running {suite} at {options.scale}...", flush=True)
+        stages.extend(run_in_subprocess(suite, options))
+
+    output = options.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{options.scale}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"meta": metadata(options), "stages": stages}, indent=2))
+    print_results(stages)
+    print(f"\nResults written to {output}")
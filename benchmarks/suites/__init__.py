@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+SUITES = ("matchmaker", "translator", "weather", "research", "startup")
+
+
+def use_app(directory):
+    """
+    Make one app's flat modules importable.
+
+    Each suite runs in its own process, so apps with same-named modules
+    (batch.py, cache.py) never clash.
+    """
+    for path in (str(ROOT), str(ROOT / directory)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
@@ -0,0 +1,82 @@
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import corpora
+from benchmarks.fakes import FakeOpenAI
+from benchmarks.suites import use_app
+
+use_app("Matchmaker-Agent")
+
+from ann import LSHIndex, recall_at_k  # noqa: E402
+from batch import batch_top_k  # noqa: E402
+from index import ProfileIndex  # noqa: E402
+from store import ProfileStore  # noqa: E402
+from tools import find_matches  # noqa: E402
+
+
+def run(recorder, n, options):
+    """Profile store, TF-IDF index, exact/LSH search, bulk scoring and the agent."""
+    records = corpora.profiles(n)
+    bios = corpora.user_bios(options.queries)
+    workdir = Path(tempfile.mkdtemp(prefix="bench-matchmaker-"))
+
+    store = recorder.once("store.from_records", ProfileStore.from_records, records, items=n)
+    del records
+    recorder.once("store.save", store.save, str(workdir / "store"), items=n)
+    store = recorder.once("store.load_mmap", ProfileStore.load, str(workdir / "store"), items=n)
+
+    index = recorder.once("index.fit", ProfileIndex.fit, store, items=n)
+    recorder.once("index.save", index.save, str(workdir / "index"), items=n)
+    index = recorder.once("index.load_mmap", ProfileIndex.load, str(workdir / "index"), items=n)
+
+    recorder.measure(
+        "find_matches.exact", lambda bio: find_matches({"bio": bio}, store, top_n=5, index=index),
+        [(bio,) for bio in bios], warmup=3,
+    )
+
+    lsh = recorder.once("ann.build", LSHIndex.build, index, items=n)
+    for probes in (1, 4):
+        recorder.measure(
+            f"find_matches.lsh_probes_{probes}",
+            lambda bio: find_matches({"bio": bio}, store, top_n=5, index=index, ann=lsh, n_probes=probes),
+            [(bio,) for bio in bios], warmup=3,
+        )
+        # Speed alone says nothing without the share of exact matches kept
+        recorder.results[-1]["recall_at_5"] = recall_at_k(lsh, index, bios, k=5, n_probes=probes)
+
+    everyone = corpora.user_bios(min(n, 10_000), seed=5)
+    recorder.once("batch_top_k", batch_top_k, index, everyone, 5, items=len(everyone))
+
+    _run_agent(recorder, options, workdir)
+
+
+def _run_agent(recorder, options, workdir):
+    try:
+        from openai import OpenAI
+        from agent import MatchmakerAgent
+    except ImportError as e:
+        for stage in ("agent.first_token", "agent.complete", "agent.cached"):
+            recorder.skip(stage, f"missing dependency: {e.name}")
+        return
+
+    forms = [
+        {"name": f"User {n}", "age": 30, "gender": "Female", "interests": bio, "looking_for": "kind and curious"}
+        for n, bio in enumerate(corpora.user_bios(max(options.queries // 10, 5), seed=6))
+    ]
+    with FakeOpenAI(latency=options.latency, payload_bytes=options.payload_bytes) as server:
+        client = OpenAI(api_key="benchmark", base_url=f"{server.url}/v1")
+        agent = MatchmakerAgent(client=client, profiles_path=workdir / "store", index_path=workdir / "index")
+
+        first_tokens = []
+
+        def complete(form):
+            started = time.perf_counter()
+            for number, _ in enumerate(agent.stream(form)):
+                if number == 0:
+                    first_tokens.append(time.perf_counter() - started)
+
+        recorder.measure("agent.complete", complete, [(form,) for form in forms])
+        recorder.results[-1].update(agent.usage)  # Token counts reported by the fake
+        recorder.record("agent.first_token", first_tokens)
+        recorder.measure("agent.cached", complete, [(form,) for form in forms])
@@ -0,0 +1,75 @@
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks import corpora
+from benchmarks.fakes import FakeGemini, FakeTavily, gemini_llm, tavily_search
+from benchmarks.suites import use_app
+
+use_app("Research-Agent")
+
+from cache import ResearchCache  # noqa: E402
+from formatting import BulletFormatter, format_bullets  # noqa: E402
+from passages import prepare_context  # noqa: E402
+from pipeline import EXTRA_ANGLES, SUB_QUERY_ANGLES, research, sub_queries  # noqa: E402
+
+MAX_TOPICS = 20
+NUM_RESULTS = 5
+
+
+def run(recorder, n, options):
+    """End-to-end pipeline (uncached, fanned out and cached), context packing and bullet streaming."""
+    workdir = Path(tempfile.mkdtemp(prefix="bench-research-"))
+    topics = corpora.topics(min(options.queries, MAX_TOPICS))
+    serving = dict(latency=options.latency, payload_bytes=options.payload_bytes)
+
+    with FakeTavily(**serving) as tavily, FakeGemini(**serving) as gemini:
+        search = tavily_search(tavily.url)
+        llm = gemini_llm(gemini.url)
+
+        results = recorder.measure(
+            "pipeline.uncached", lambda topic: research(topic, search, llm, num_results=NUM_RESULTS),
+            [(topic,) for topic in topics],
+        )
+        recorder.results[-1]["tokens_saved_mean"] = sum(
+            result.context.tokens_saved for result in results
+        ) / len(results)
+
+        # Every angle searched and every result summarised before the merge
+        angles = SUB_QUERY_ANGLES + EXTRA_ANGLES
+        before = tavily.requests + gemini.requests
+        recorder.measure(
+            "pipeline.fanout",
+            lambda topic: research(topic, search, llm, num_results=NUM_RESULTS, angles=angles, summarise_each=True),
+            [(topic,) for topic in topics],
+        )
+        recorder.results[-1]["requests"] = tavily.requests + gemini.requests - before
+
+        cache = ResearchCache(db_path=workdir / "research_cache.db")
+        for name in ("pipeline.cache_fill", "pipeline.cached"):
+            before = tavily.requests + gemini.requests
+            recorder.measure(
+                name, lambda topic: research(topic, search, llm, num_results=NUM_RESULTS, cache=cache),
+                [(topic,) for topic in topics],
+            )
+            recorder.results[-1]["requests"] = tavily.requests + gemini.requests - before
+
+        raw = [result for topic in topics for query in sub_queries(topic, angles) for result in search(query, NUM_RESULTS)]
+
+    recorder.measure(
+        "prepare_context", lambda topic: prepare_context(raw, topic), [(topic,) for topic in topics],
+        items=len(raw),
+    )
+
+    text = "\n".join(f"* {corpora.sentence(random.Random(seed))}" for seed in range(200))
+    chunks = [text[start:start + 16] for start in range(0, len(text), 16)]
+
+    def stream_bullets():
+        formatter = BulletFormatter()
+        for chunk in chunks:
+            formatter.feed(chunk)
+        formatter.finish()
+
+    # One 200-point summary per call in both stages, so throughput compares directly
+    recorder.measure("bullets.streaming", stream_bullets, [()] * options.queries)
+    recorder.measure("bullets.batch", format_bullets, [(text,)] * options.queries)
@@ -0,0 +1,23 @@
+from benchmarks.imports import APPS, profile, rerun_times
+
+RERUNS = 10
+
+
+def run(recorder, n, options):
+    """Cold-start imports of each app's script and, with Streamlit installed, full reruns."""
+    for app in APPS:
+        report = profile(app)
+        result = recorder.record(f"imports.{app}", [report["seconds"]], items=len(report["statements"]))
+        if report["missing"]:
+            result["missing"] = sorted(set(report["missing"]))
+
+    for app in APPS:
+        reruns = rerun_times(app, RERUNS)
+        if "missing" in reruns:
+            recorder.skip(f"rerun.{app}", f"missing dependency: {reruns['missing']}")
+            continue
+        first, *rest = reruns["seconds"]
+        recorder.record(f"rerun.{app}.cold", [first])
+        result = recorder.record(f"rerun.{app}.warm", rest)
+        if reruns["exceptions"]:
+            result["exceptions"] = reruns["exceptions"]
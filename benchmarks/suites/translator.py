@@ -0,0 +1,93 @@
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks import corpora
+from benchmarks.fakes import FakeGemini
+from benchmarks.measure import Stage
+from benchmarks.suites import use_app
+from common.langid import LanguageIdentifier
+
+use_app("Multilingual-translator")
+
+import memory  # noqa: E402
+from batch import translate_segments  # noqa: E402
+from cache import TranslationCache, cache_key  # noqa: E402
+from client import GeminiClient  # noqa: E402
+
+# Stored rows looked up again by the cache stages
+SAMPLE_ROWS = 1000
+
+
+def run(recorder, n, options):
+    """Translation memory writes, history pages, cache lookups and batch translation."""
+    memory.DB_NAME = str(Path(tempfile.mkdtemp(prefix="bench-translator-")) / "memory.db")
+    rng = random.Random(0)
+    sample = []
+
+    def save(rows):
+        memory.save_translations([(*row, cache_key(row[0], row[2])) for row in rows])
+
+    # Streamed chunk by chunk, so a 1M-row history is never held in memory
+    stage = Stage(recorder.suite, "memory.save_translations")
+    for rows in corpora.translations(n):
+        with stage.time(items=len(rows)):
+            save(rows)
+        sample.extend(rng.sample(rows, max(1, SAMPLE_ROWS * len(rows) // n)))
+    recorder.results.append(stage.result())
+
+    queries = range(options.queries)
+    recorder.measure("history.first_page", lambda _: memory.get_translations_page(), [(q,) for q in queries])
+
+    def walk(pages):
+        cursor = None
+        for _ in range(pages):
+            _, cursor = memory.get_translations_page(before=cursor)
+            if cursor is None:
+                break
+    recorder.once("history.walk_100_pages", walk, 100, items=100)
+
+    languages = corpora.LANGUAGES
+    recorder.measure(
+        "history.language_filter",
+        lambda language: memory.get_translations_page(target_lang=language),
+        [(languages[q % len(languages)],) for q in queries],
+    )
+    recorder.measure(
+        "history.full_text_search",
+        lambda word: memory.get_translations_page(search=word),
+        [(corpora.WORDS[q % len(corpora.WORDS)],) for q in queries],
+    )
+
+    cache = TranslationCache()
+    groups = [sample[start:start + 100] for start in range(0, len(sample), 100)]
+    for name in ("cache.get_many_db", "cache.get_many_memory"):  # Second pass hits the in-process LRU
+        recorder.measure(
+            name,
+            lambda rows: [cache.get_many([row[0] for row in rows if row[2] == lang], lang) for lang in languages],
+            [(rows,) for rows in groups], items=100,
+        )
+
+    with FakeGemini(latency=options.latency, payload_bytes=options.payload_bytes) as server:
+        client = GeminiClient("benchmark", api_url=f"{server.url}/generateContent")
+        recorder.measure("client.generate", client.generate, [(f"Translate {q}",) for q in queries])
+
+        segments = corpora.segments(min(max(n // 10, 100), 5_000))
+        for name in ("translate_segments.cold", "translate_segments.cached"):
+            before = server.requests
+            recorder.once(name, translate_segments, segments, "French", client, cache, items=len(segments))
+            recorder.results[-1]["requests"] = server.requests - before
+
+    try:
+        import langdetect  # noqa: F401
+    except ImportError:
+        recorder.skip("langid", "missing dependency: langdetect")
+        return
+    identifier = LanguageIdentifier()
+    recorder.once("langid.load_profiles", lambda: identifier.factory)
+    pages = [segments[start:start + 20] for start in range(0, min(len(segments), 2_000), 20)]
+    for name in ("langid.detect_many.cold", "langid.detect_many.memo"):
+        recorder.measure(name, identifier.detect_many, [(page,) for page in pages], items=20)
+    # Whole files as one text; the prefix cap keeps these near short-text cost
+    long_texts = [" ".join(segments[start:] + segments[:start]) for start in range(min(len(segments), 20))]
+    recorder.measure("langid.detect.long_text", identifier.detect, [(text,) for text in long_texts])
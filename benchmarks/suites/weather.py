@@ -0,0 +1,56 @@
+import tempfile
+from pathlib import Path
+
+from benchmarks import corpora
+from benchmarks.fakes import FakeNominatim, FakeOpenMeteo, nominatim_geocoder
+from benchmarks.suites import use_app
+
+use_app("Weather-Agent")
+
+from charts import hourly_series, render_png, vega_lite_spec  # noqa: E402
+from forecast import ForecastCache  # noqa: E402
+from geocode import GeocodeCache  # noqa: E402
+from multicity import compare_cities  # noqa: E402
+
+MAX_CITIES = 200
+
+
+def run(recorder, n, options):
+    """Geocode and forecast caches, multi-city comparison and chart rendering."""
+    workdir = Path(tempfile.mkdtemp(prefix="bench-weather-"))
+    cities = corpora.cities(min(options.queries, MAX_CITIES))
+    serving = dict(latency=options.latency, payload_bytes=options.payload_bytes)
+
+    with FakeNominatim(**serving) as nominatim, FakeOpenMeteo(**serving) as open_meteo:
+        geocoder = nominatim_geocoder(nominatim.url)
+        geocodes = GeocodeCache(geocoder=geocoder, db_path=workdir / "geocode.db", seed_path=None)
+        places = recorder.measure("geocode.remote", geocodes.geocode, [(city,) for city in cities])
+        recorder.measure("geocode.memory", geocodes.geocode, [(city,) for city in cities])
+        reopened = GeocodeCache(geocoder=geocoder, db_path=workdir / "geocode.db", seed_path=None)
+        recorder.measure("geocode.sqlite", reopened.geocode, [(city,) for city in cities])
+
+        forecasts = ForecastCache(api_url=open_meteo.url)
+        points = [(place.latitude, place.longitude) for place in places]
+        recorder.measure("forecast.remote", forecasts.get, points)
+        recorder.measure("forecast.cached", forecasts.get, points)
+
+        comparison = cities[:50]
+        for name in ("compare_cities.cold", "compare_cities.warm"):
+            if name.endswith("cold"):
+                geocodes = GeocodeCache(geocoder=geocoder, db_path=workdir / f"{name}.db", seed_path=None)
+                forecasts = ForecastCache(api_url=open_meteo.url)
+            before = nominatim.requests + open_meteo.requests
+            recorder.once(name, compare_cities, comparison, geocodes, forecasts, items=len(comparison))
+            recorder.results[-1]["requests"] = nominatim.requests + open_meteo.requests - before
+
+        forecast = forecasts.get(*points[0])
+        key = forecasts.key(*points[0])
+        recorder.measure("charts.vega_lite_spec", lambda: vega_lite_spec([hourly_series(forecast)], "Forecast"),
+                         [()] * options.queries)
+        try:
+            import matplotlib  # noqa: F401
+        except ImportError:
+            recorder.skip("charts.render_png", "missing dependency: matplotlib")
+            return
+        recorder.measure("charts.render_png", lambda: render_png(key, [hourly_series(forecast)], "Forecast"),
+                         [()] * options.queries)
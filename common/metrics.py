@@ -0,0 +1,359 @@
+"""
+Lightweight tracing and metrics shared by the agents.
+
+Spans (context manager or decorator) time a stage and feed a latency
+histogram; counters, histograms and gauges cover the rest, and cache
+statistics are read through callbacks only when metrics are exported.
+Everything can be written as Prometheus text (file or /metrics endpoint)
+and spans as JSON-lines trace logs.
+
+Instrumentation is off unless AGENT_METRICS=1 (or `enable()` is called);
+while off, every call returns after a single flag check.
+
+Environment:
+    AGENT_METRICS       1 to enable.
+    AGENT_METRICS_PORT  Serve Prometheus text on this port.
+    AGENT_METRICS_FILE  Write Prometheus text to this file at exit.
+    AGENT_METRICS_JSON  Write the metrics as JSON to this file at exit.
+    AGENT_TRACE_FILE    Append one JSON object per finished span.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import math
+import os
+import threading
+import time
+
+PREFIX = "agent_"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, math.inf)
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_gauges = {}
+_gauge_callbacks = {}
+_trace_file = None
+_server = None
+_span_ids = itertools.count(1)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def enabled():
+    return _enabled
+
+
+def enable(trace_path=None):
+    """Turn instrumentation on, optionally appending span traces to `trace_path`."""
+    global _enabled, _trace_file
+    with _lock:
+        if trace_path and _trace_file is None:
+            _trace_file = open(trace_path, "a", encoding="utf-8", buffering=1)
+        _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Forget every recorded value (gauge callbacks stay registered)."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _gauges.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+# ---------- Recording ----------
+def count(name, value=1, **labels):
+    """Add `value` to a counter."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record one sample in a histogram."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for position, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                histogram["counts"][position] += 1
+                break
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+def gauge(name, value, **labels):
+    """Set a gauge to `value`."""
+    if not _enabled:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def watch_cache(name, stats):
+    """
+    Export a cache's hit/miss statistics as gauges.
+
+    `stats()` is only called when metrics are exported, so caches pay
+    nothing per lookup. It returns a dict; numeric `hits`, `misses`,
+    `hit_rate`, `evictions` and `remote_lookups` values are exported.
+    """
+    _gauge_callbacks[name] = stats
+
+
+# ---------- Spans ----------
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """Times a block; nested spans record their parent."""
+
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "started", "wall_started", "_token")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. result sizes) to the trace event."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.span_id = next(_span_ids)
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.wall_started = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        _current_span.reset(self._token)
+        status = "error" if exc_type else "ok"
+        observe(f"{self.name}_seconds", duration)
+        if exc_type:
+            count(f"{self.name}_errors_total")
+        if _trace_file is not None:
+            event = {
+                "name": self.name,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "start": self.wall_started,
+                "duration_ms": round(duration * 1000, 3),
+                "thread": threading.current_thread().name,
+                "status": status,
+            }
+            if self.attrs:
+                event["attrs"] = self.attrs
+            if exc_type:
+                event["error"] = repr(exc)
+            line = json.dumps(event, default=str)
+            with _lock:
+                _trace_file.write(line + "\n")
+        return False
+
+
+def span(name, **attrs):
+    """
+    Context manager timing a stage, e.g. `with span("research_search"):`.
+
+    Records `<name>_seconds` and, on exceptions, `<name>_errors_total`.
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def traced(name):
+    """Decorator form of `span` for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with Span(name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---------- Export ----------
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _cache_gauges():
+    values = {}
+    for cache, stats in list(_gauge_callbacks.items()):
+        try:
+            data = stats()
+        except Exception:
+            continue
+        for field in ("hits", "misses", "hit_rate", "evictions", "remote_lookups"):
+            value = data.get(field)
+            if isinstance(value, (int, float)):
+                values[_key(f"cache_{field}", {"cache": cache})] = value
+    return values
+
+
+def snapshot():
+    """Every metric as plain data, for JSON export."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(value, counts=list(value["counts"])) for key, value in _histograms.items()}
+        gauges = dict(_gauges)
+    gauges.update(_cache_gauges())
+
+    def rows(values):
+        return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in values.items()]
+    return {
+        "counters": rows(counters),
+        "gauges": rows(gauges),
+        "histograms": [
+            {"name": name, "labels": dict(labels), "count": value["count"], "sum": value["sum"],
+             "buckets": dict(zip(map(str, value["buckets"]), itertools.accumulate(value["counts"])))}
+            for (name, labels), value in histograms.items()
+        ],
+    }
+
+
+def prometheus_text():
+    """Metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for row in data["counters"]:
+        name = PREFIX + row["name"]
+        header(name, "counter")
+        lines.append(f"{name}{_labels(row['labels'].items())} {row['value']}")
+    for row in data["gauges"]:
+        name = PREFIX + row["name"]
+        header(name, "gauge")
+        lines.append(f"{name}{_labels(row['labels'].items())} {row['value']}")
+    for row in data["histograms"]:
+        name = PREFIX + row["name"]
+        header(name, "histogram")
+        for bound, cumulative in row["buckets"].items():
+            le = "+Inf" if bound == "inf" else bound
+            lines.append(f"{name}_bucket{_labels(row['labels'].items(), [('le', le)])} {cumulative}")
+        lines.append(f"{name}_sum{_labels(row['labels'].items())} {row['sum']}")
+        lines.append(f"{name}_count{_labels(row['labels'].items())} {row['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Write the metrics to a file, e.g. for node_exporter's textfile collector."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(prometheus_text())
+    os.replace(temporary, path)
+
+
+def write_json(path):
+    """Write the metrics as JSON (see `snapshot()`), e.g. for benchmark reports."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(snapshot(), file, indent=2)
+    os.replace(temporary, path)
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics on a background thread; later calls are no-ops."""
+    # http.server is imported here so the apps don't pay for it at startup
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+def configure_from_env():
+    if os.getenv("AGENT_METRICS", "").lower() not in ("1", "true", "yes"):
+        return
+    enable(os.getenv("AGENT_TRACE_FILE"))
+    path = os.getenv("AGENT_METRICS_FILE")
+    if path:
+        atexit.register(write_prometheus, path)
+    path = os.getenv("AGENT_METRICS_JSON")
+    if path:
+        atexit.register(write_json, path)
+    port = os.getenv("AGENT_METRICS_PORT")
+    if port:
+        try:
+            serve(int(port))
+        except OSError:
+            pass  # Another process (or Streamlit worker) already serves it
+
+
+configure_from_env()
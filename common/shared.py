@@ -0,0 +1,31 @@
+import functools
+import inspect
+import threading
+
+
+def shared(factory):
+    """
+    Turn a factory into an accessor for process-wide instances, one per
+    distinct set of arguments.
+
+    Streamlit reruns scripts on many threads, and caches, pools and clients
+    should be built once and shared by every session. The first call with
+    given arguments runs `factory` under a lock, so racing sessions never
+    build two; later calls return the same object. Arguments are bound to
+    the signature first, so `get(key)` and `get(key, default)` share one.
+    """
+    signature = inspect.signature(factory)
+    lock = threading.Lock()
+    instances = {}
+
+    @functools.wraps(factory)
+    def get(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.items())
+        with lock:
+            if key not in instances:
+                instances[key] = factory(*bound.args, **bound.kwargs)
+            return instances[key]
+
+    return get
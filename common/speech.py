@@ -0,0 +1,340 @@
+"""
+Streaming speech input for the WebRTC audio callbacks.
+
+The media thread only downmixes, resamples and buffers each ~20 ms frame,
+and a cheap energy-based voice-activity detector cuts the stream into
+utterances. Recognition then runs once per utterance on a background
+worker, so the audio thread never waits on the network.
+"""
+
+import queue
+import threading
+import wave
+
+import numpy as np
+
+TARGET_RATE = 16000
+FRAME_MS = 20
+
+
+# ---------- Signal helpers ----------
+def to_mono(samples, channels=1, planar=False):
+    """
+    Downmix interleaved or planar samples to mono float32 in [-1, 1].
+
+    Args:
+        samples (np.ndarray): Raw samples as returned by `frame.to_ndarray()`.
+        channels (int): Number of channels in the frame.
+        planar (bool): One row per channel instead of interleaved samples.
+    """
+    samples = np.asarray(samples)
+    scale = 1.0
+    if np.issubdtype(samples.dtype, np.integer):
+        scale = float(np.iinfo(samples.dtype).max) + 1
+    samples = samples.astype(np.float32) / scale
+    if channels > 1:
+        shape = (channels, -1) if planar else (-1, channels)
+        samples = samples.reshape(shape).mean(axis=0 if planar else 1)
+    return samples.reshape(-1)
+
+
+def resample(samples, src_rate, dst_rate=TARGET_RATE):
+    """Linear-interpolation resampling; plenty for speech recognition."""
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def to_pcm16(samples):
+    """Mono float32 samples to little-endian 16-bit PCM bytes."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+# ---------- Buffering ----------
+class RingBuffer:
+    """Fixed-capacity float32 sample buffer that overwrites its oldest samples."""
+
+    def __init__(self, capacity):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)[-self.capacity:]
+        end = (self._start + self._size) % self.capacity
+        first = min(len(samples), self.capacity - end)
+        self._data[end:end + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+
+        overflow = max(self._size + len(samples) - self.capacity, 0)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + len(samples), self.capacity)
+
+    def read(self):
+        """All buffered samples, oldest first."""
+        idx = (self._start + np.arange(self._size)) % self.capacity
+        return self._data[idx]
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+
+class EnergyVAD:
+    """
+    Energy-threshold voice-activity detection over fixed-size blocks.
+
+    Speech starts after `start_ms` of blocks above `threshold` RMS and ends
+    after `hangover_ms` of blocks below it. A short pre-roll is kept so the
+    first syllable is not clipped, and utterances are force-cut at
+    `max_utterance_s`.
+    """
+
+    def __init__(
+        self,
+        rate=TARGET_RATE,
+        threshold=0.015,
+        start_ms=60,
+        hangover_ms=600,
+        min_utterance_ms=300,
+        max_utterance_s=15,
+        preroll_ms=200,
+    ):
+        self.rate = rate
+        self.threshold = threshold
+        self.block = rate * FRAME_MS // 1000
+        self.start_blocks = max(1, start_ms // FRAME_MS)
+        self.hangover_blocks = max(1, hangover_ms // FRAME_MS)
+        self.min_samples = rate * min_utterance_ms // 1000
+        self.utterance = RingBuffer(int(rate * max_utterance_s))
+        self.preroll = RingBuffer(max(self.block, rate * preroll_ms // 1000))
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speaking = False
+        self._loud = 0
+        self._quiet = 0
+
+    def feed(self, samples):
+        """
+        Add mono samples at `rate`.
+
+        Returns:
+            list: Utterances (float32 arrays) completed by these samples.
+        """
+        samples = np.concatenate([self._pending, samples])
+        n_blocks = len(samples) // self.block
+        self._pending = samples[n_blocks * self.block:]
+        if n_blocks == 0:
+            return []
+
+        blocks = samples[:n_blocks * self.block].reshape(n_blocks, self.block)
+        loud = np.sqrt(np.mean(np.square(blocks), axis=1)) >= self.threshold
+
+        finished = []
+        for block, is_loud in zip(blocks, loud):
+            if not self._speaking:
+                self._loud = self._loud + 1 if is_loud else 0
+                self.preroll.write(block)
+                if self._loud >= self.start_blocks:
+                    self._speaking = True
+                    self._quiet = 0
+                    self.utterance.write(self.preroll.read())
+                    self.preroll.clear()
+                continue
+
+            self.utterance.write(block)
+            self._quiet = 0 if is_loud else self._quiet + 1
+            if self._quiet >= self.hangover_blocks or len(self.utterance) == self.utterance.capacity:
+                finished.extend(self._cut())
+        return finished
+
+    def flush(self):
+        """End of stream: return the utterance in progress, if any."""
+        return self._cut() if self._speaking else []
+
+    def _cut(self):
+        audio = self.utterance.read()
+        self.utterance.clear()
+        self._speaking = False
+        self._loud = 0
+        # The trailing hangover is silence, so it doesn't count towards the minimum
+        voiced = len(audio) - self._quiet * self.block
+        return [audio] if voiced >= self.min_samples else []
+
+
+# ---------- Recognition ----------
+class GoogleBackend:
+    """Google Web Speech through SpeechRecognition, imported on first use."""
+
+    def __init__(self, language="en-US"):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, pcm, rate):
+        try:
+            return self.recognizer.recognize_google(self._sr.AudioData(pcm, rate, 2), language=self.language)
+        except self._sr.UnknownValueError:
+            return None
+
+
+class StreamingRecognizer:
+    """
+    Buffers audio frames and recognises each utterance on a worker thread.
+
+    `backend` is any object with `recognize(pcm16_bytes, rate) -> str | None`,
+    so tests can swap in a fake. Recognised text is queued for the Streamlit
+    script to `poll()` on its next rerun, and `on_result` is also called
+    from the worker thread when given.
+    """
+
+    def __init__(self, backend, on_result=None, vad=None, max_pending=8):
+        self.backend = backend
+        self.on_result = on_result
+        self.vad = vad or EnergyVAD()
+        self.errors = 0
+        self._utterances = queue.Queue(maxsize=max_pending)
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="speech-recognizer", daemon=True)
+        self._worker.start()
+
+    def push_frame(self, frame):
+        """Feed one `av.AudioFrame`; cheap enough for the media callback."""
+        self.push(
+            frame.to_ndarray(),
+            frame.sample_rate,
+            channels=len(frame.layout.channels),
+            planar=frame.format.is_planar,
+        )
+
+    def push(self, samples, rate, channels=1, planar=False):
+        """Feed raw samples from any source."""
+        mono = resample(to_mono(samples, channels, planar), rate, self.vad.rate)
+        with self._lock:
+            utterances = self.vad.feed(mono)
+        for utterance in utterances:
+            self._submit(utterance)
+
+    def flush(self):
+        """Recognise whatever is still buffered, e.g. when the stream stops."""
+        with self._lock:
+            utterances = self.vad.flush()
+        for utterance in utterances:
+            self._submit(utterance)
+
+    def _submit(self, utterance):
+        try:
+            self._utterances.put_nowait(utterance)
+        except queue.Full:
+            pass  # Recognition is falling behind; drop rather than block audio
+
+    def _run(self):
+        while True:
+            utterance = self._utterances.get()
+            if utterance is None:
+                return
+            try:
+                text = self.backend.recognize(to_pcm16(utterance), self.vad.rate)
+                if text:
+                    self._results.put(text)
+                    if self.on_result:
+                        self.on_result(text)
+            except Exception:
+                self.errors += 1  # Network or backend failure; keep listening
+            finally:
+                self._utterances.task_done()
+
+    def poll(self):
+        """Texts recognised since the last call, oldest first."""
+        texts = []
+        while True:
+            try:
+                texts.append(self._results.get_nowait())
+            except queue.Empty:
+                return texts
+
+    def join(self):
+        """Block until every queued utterance has been recognised."""
+        self._utterances.join()
+
+    def stop(self):
+        self._utterances.put(None)
+        self._worker.join(timeout=5)
+
+
+# ---------- WebRTC glue ----------
+_processor_class = None
+_processor_lock = threading.Lock()
+
+
+def audio_processor_class():
+    """
+    streamlit-webrtc audio processor feeding a StreamingRecognizer.
+
+    streamlit-webrtc pulls in aiortc and PyAV, so it is imported (and the
+    class defined) on first use; every rerun then gets the same class.
+    """
+    global _processor_class
+    with _processor_lock:
+        if _processor_class is None:
+            from streamlit_webrtc import AudioProcessorBase
+
+            class AudioProcessor(AudioProcessorBase):
+                def __init__(self):
+                    # Frames are only buffered here; recognition runs once
+                    # per utterance on the pipeline's worker thread
+                    self.speech = StreamingRecognizer(GoogleBackend())
+
+                def recv(self, frame):
+                    self.speech.push_frame(frame)
+                    return frame
+
+                def on_ended(self):
+                    self.speech.flush()
+                    self.speech.stop()
+
+            _processor_class = AudioProcessor
+        return _processor_class
+
+
+# ---------- Offline input ----------
+def read_wav(path):
+    """Load a PCM WAV file as (mono float32 samples, sample rate)."""
+    with wave.open(str(path), "rb") as wav:
+        width = wav.getsampwidth()
+        if width not in (1, 2, 4):
+            raise ValueError(f"❌ Unsupported WAV sample width: {width} bytes")
+        dtype = {1: np.uint8, 2: "<i2", 4: "<i4"}[width]
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=dtype)
+        if width == 1:
+            samples = (samples.astype(np.int16) - 128) * 256  # 8-bit WAV is unsigned
+        return to_mono(samples, wav.getnchannels()), wav.getframerate()
+
+
+def transcribe_wav(path, backend, frame_ms=FRAME_MS, **vad_options):
+    """
+    Run a recorded WAV through the streaming pipeline frame by frame.
+
+    Returns:
+        list: Recognised texts, one per detected utterance.
+    """
+    samples, rate = read_wav(path)
+    recognizer = StreamingRecognizer(backend, vad=EnergyVAD(**vad_options))
+    step = rate * frame_ms // 1000
+    for start in range(0, len(samples), step):
+        recognizer.push(samples[start:start + step], rate)
+    recognizer.flush()
+    recognizer.join()
+    recognizer.stop()
+    return recognizer.poll()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The repo root, so `common` imports the way the apps see it
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
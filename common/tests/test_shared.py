@@ -0,0 +1,39 @@
+import threading
+import time
+
+from common.shared import shared
+
+
+def test_racing_callers_share_one_instance():
+    built = []
+
+    @shared
+    def get_thing():
+        """The thing."""
+        time.sleep(0.05)  # Widen the race window
+        built.append(object())
+        return built[-1]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_thing())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(result is built[0] for result in results)
+    assert get_thing() is built[0]
+    assert get_thing.__name__ == "get_thing" and get_thing.__doc__ == "The thing."
+
+
+def test_one_instance_per_distinct_arguments():
+    @shared
+    def get_client(api_key, api_url="https://example.test"):
+        return object()
+
+    client = get_client("key")
+    assert get_client("key", "https://example.test") is client
+    assert get_client(api_key="key") is client
+    assert get_client("other") is not client
+    assert get_client("key", "https://other.test") is not client
@@ -0,0 +1,76 @@
+import wave
+
+import numpy as np
+import pytest
+
+from common.speech import TARGET_RATE, read_wav, transcribe_wav
+
+
+class FakeBackend:
+    """Names each utterance by its length, so tests can tell them apart."""
+
+    def __init__(self):
+        self.calls = []
+
+    def recognize(self, pcm, rate):
+        seconds = len(pcm) / 2 / rate
+        self.calls.append((len(pcm), rate))
+        return f"utterance of {seconds:.1f}s"
+
+
+def write_wav(path, pieces, rate=44100, channels=2):
+    """A 16-bit WAV of (seconds, amplitude) pieces: a 220 Hz tone, or silence at amplitude 0."""
+    signal = np.concatenate([
+        amplitude * np.sin(2 * np.pi * 220 * np.arange(int(seconds * rate)) / rate)
+        for seconds, amplitude in pieces
+    ])
+    frames = np.repeat((signal * 32767).astype("<i2")[:, None], channels, axis=1)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames.tobytes())
+
+
+def test_read_wav_downmixes_to_mono(tmp_path):
+    path = tmp_path / "tone.wav"
+    write_wav(path, [(0.5, 0.5)], rate=22050, channels=2)
+
+    samples, rate = read_wav(path)
+
+    assert rate == 22050
+    assert samples.dtype == np.float32 and len(samples) == 11025
+    assert np.abs(samples).max() == pytest.approx(0.5, abs=0.01)
+
+
+def test_transcribe_wav_recognises_each_utterance(tmp_path):
+    path = tmp_path / "speech.wav"
+    write_wav(path, [(0.3, 0), (1.0, 0.3), (1.0, 0), (2.0, 0.3), (0.8, 0), (0.1, 0.3), (1.0, 0)])
+    backend = FakeBackend()
+
+    texts = transcribe_wav(path, backend)
+
+    # The 0.1 s blip is shorter than an utterance; the others keep their pre-roll and hangover
+    assert len(texts) == 2
+    assert all(rate == TARGET_RATE for _, rate in backend.calls)
+    first, second = (float(text.split()[-1].rstrip("s")) for text in texts)
+    assert 1.0 <= first <= 2.0 and 2.0 <= second <= 3.0
+    assert first < second
+
+
+def test_transcribe_wav_cuts_long_utterances(tmp_path):
+    path = tmp_path / "long.wav"
+    write_wav(path, [(3.0, 0.3)], rate=TARGET_RATE, channels=1)
+
+    texts = transcribe_wav(path, FakeBackend(), max_utterance_s=1)
+
+    assert texts[:3] == ["utterance of 1.0s"] * 3
+
+
+def test_transcribe_wav_of_silence_recognises_nothing(tmp_path):
+    path = tmp_path / "silence.wav"
+    write_wav(path, [(1.0, 0)])
+    backend = FakeBackend()
+
+    assert transcribe_wav(path, backend) == []
+    assert backend.calls == []